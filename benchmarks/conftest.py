@@ -0,0 +1,125 @@
+"""
+Нагрузочные замеры представлений.
+
+Запуск: pytest benchmarks. Перед замерами в тестовую базу один раз
+загружается синтетический набор seed_blog; размеры задают переменные
+окружения BENCH_USERS, BENCH_POSTS, BENCH_COMMENTS и BENCH_SEED.
+
+Каждое представление вызывается BENCH_ROUNDS раз через тестовый
+клиент; замеряются p50 и p95 времени ответа, число SQL-запросов
+и размер ответа. Тест падает, если значения вышли за бюджет из
+budgets.json. BENCH_UPDATE=1 перезаписывает бюджеты по текущим
+замерам, BENCH_REPORT=<файл> сохраняет замеры в JSON.
+"""
+import json
+import os
+import types
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import override_settings
+
+from benchmarks.support import RESULTS, env_int
+
+BENCH_DIR = Path(__file__).resolve().parent
+BUDGETS_PATH = BENCH_DIR / 'budgets.json'
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        call_command(
+            'seed_blog',
+            users=env_int('BENCH_USERS', 500),
+            posts=env_int('BENCH_POSTS', 20000),
+            comments=env_int('BENCH_COMMENTS', 100000),
+            seed=env_int('BENCH_SEED', 0),
+            verbosity=0,
+        )
+
+
+@pytest.fixture(scope='session')
+def targets(django_db_setup, django_db_blocker):
+    """Объекты из набора, на которых замеряются представления."""
+    from blog.models import Category, Comment, Post
+
+    with django_db_blocker.unblock():
+        post = Post.objects.published().select_related('author').order_by(
+            '-comment_count', 'id'
+        ).first()
+        comment = Comment.objects.filter(post=post).select_related(
+            'author'
+        ).order_by('id').first()
+        category = Category.objects.filter(is_published=True).annotate(
+            total=Count('posts')
+        ).order_by('-total', 'id').first()
+    return types.SimpleNamespace(
+        post=post,
+        author=post.author,
+        comment=comment,
+        category=category,
+        word=post.title.split()[0],
+    )
+
+
+@pytest.fixture(autouse=True)
+def bench_settings(tmp_path):
+    """
+    Замеряется построение страниц, а не отдача из кэша страниц.
+
+    Кэш данных (счётчики, карточки, справочник) остаётся включённым:
+    после прогревочных вызовов он в том же состоянии, что и
+    на работающем сайте.
+    """
+    cache.clear()
+    with override_settings(
+        DEBUG=False,
+        PAGE_CACHE_TIMEOUT=0,
+        METRICS_DIR=str(tmp_path / 'metrics'),
+        REGISTRY_VERSION_FILE=str(tmp_path / 'registry.version'),
+    ):
+        yield
+
+
+@pytest.fixture(scope='session')
+def budgets():
+    if not BUDGETS_PATH.exists():
+        return {}
+    return json.loads(BUDGETS_PATH.read_text())
+
+
+def pytest_sessionfinish(session):
+    if not RESULTS:
+        return
+    if os.environ.get('BENCH_UPDATE'):
+        BUDGETS_PATH.write_text(json.dumps(
+            {
+                name: result.budget()
+                for name, result in sorted(RESULTS.items())
+            },
+            indent=2,
+        ) + '\n')
+    report = os.environ.get('BENCH_REPORT')
+    if report:
+        Path(report).write_text(json.dumps(
+            {name: result.as_dict() for name, result in RESULTS.items()},
+            indent=2,
+        ) + '\n')
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not RESULTS:
+        return
+    terminalreporter.section('benchmarks')
+    terminalreporter.write_line(
+        f'{"view":<28}{"p50, мс":>10}{"p95, мс":>10}'
+        f'{"запросы":>9}{"байт":>10}'
+    )
+    for name, result in sorted(RESULTS.items()):
+        terminalreporter.write_line(
+            f'{name:<28}{result.p50:>10.1f}{result.p95:>10.1f}'
+            f'{result.queries:>9}{result.size:>10}'
+        )
@@ -0,0 +1,8 @@
+import os
+
+# Замеры текущего прогона по именам представлений.
+RESULTS = {}
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
@@ -0,0 +1,183 @@
+import math
+import os
+import time
+from dataclasses import asdict, dataclass
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+
+from benchmarks.support import RESULTS, env_int
+
+pytestmark = [pytest.mark.django_db]
+
+WARMUP_ROUNDS = 2
+# Запас бюджета времени при BENCH_UPDATE: замеры на разных машинах
+# и прогонах заметно различаются, число запросов — нет.
+LATENCY_HEADROOM = 3
+MIN_LATENCY_BUDGET_MS = 10
+SIZE_HEADROOM = 1.2
+
+
+@dataclass
+class Measurement:
+    p50: float
+    p95: float
+    queries: int
+    size: int
+
+    def as_dict(self):
+        return asdict(self)
+
+    def budget(self):
+        return {
+            'p95_ms': max(
+                math.ceil(self.p95 * LATENCY_HEADROOM),
+                MIN_LATENCY_BUDGET_MS
+            ),
+            'queries': self.queries,
+            'bytes': math.ceil(self.size * SIZE_HEADROOM),
+        }
+
+
+def percentile(values, share):
+    """Значение, не больше которого доля share замеров (nearest-rank)."""
+    values = sorted(values)
+    return values[max(math.ceil(share * len(values)) - 1, 0)]
+
+
+# name: (метод, кто запрашивает, URL по targets, данные POST)
+CASES = {
+    'blog:index': ('get', None, lambda t: reverse('blog:index'), None),
+    'blog:index page 50': (
+        'get', None, lambda t: reverse('blog:index') + '?page=50', None
+    ),
+    'blog:category_posts': (
+        'get', None,
+        lambda t: reverse('blog:category_posts', args=(t.category.slug,)),
+        None,
+    ),
+    'blog:profile': (
+        'get', None,
+        lambda t: reverse('blog:profile', args=(t.author.username,)),
+        None,
+    ),
+    'blog:profile owner': (
+        'get', 'author',
+        lambda t: reverse('blog:profile', args=(t.author.username,)),
+        None,
+    ),
+    'blog:post_detail': (
+        'get', None,
+        lambda t: reverse('blog:post_detail', args=(t.post.pk,)), None,
+    ),
+    'blog:post_comments': (
+        'get', None,
+        lambda t: reverse('blog:post_comments', args=(t.post.pk,)), None,
+    ),
+    'blog:search': (
+        'get', None, lambda t: reverse('blog:search') + f'?q={t.word}', None
+    ),
+    'blog:create_post': (
+        'get', 'author', lambda t: reverse('blog:create_post'), None
+    ),
+    'blog:edit_post': (
+        'get', 'author',
+        lambda t: reverse('blog:edit_post', args=(t.post.pk,)), None,
+    ),
+    'blog:delete_post': (
+        'get', 'author',
+        lambda t: reverse('blog:delete_post', args=(t.post.pk,)), None,
+    ),
+    'blog:add_comment': (
+        'post', 'author',
+        lambda t: reverse('blog:add_comment', args=(t.post.pk,)),
+        {'text': 'Замер'},
+    ),
+    'blog:edit_comment': (
+        'get', 'commenter',
+        lambda t: reverse(
+            'blog:edit_comment', args=(t.post.pk, t.comment.pk)
+        ),
+        None,
+    ),
+    'blog:delete_comment': (
+        'get', 'commenter',
+        lambda t: reverse(
+            'blog:delete_comment', args=(t.post.pk, t.comment.pk)
+        ),
+        None,
+    ),
+    'blog:edit_profile': (
+        'get', 'author', lambda t: reverse('blog:edit_profile'), None
+    ),
+    'pages:about': ('get', None, lambda t: reverse('pages:about'), None),
+    'pages:rules': ('get', None, lambda t: reverse('pages:rules'), None),
+}
+
+
+def make_client(role, targets):
+    client = Client()
+    users = {'author': targets.author, 'commenter': targets.comment.author}
+    if role is not None:
+        client.force_login(users[role])
+    return client
+
+
+def measure(client, method, url, data):
+    request = getattr(client, method)
+    for _ in range(WARMUP_ROUNDS):
+        request(url, data)
+    timings = []
+    for _ in range(env_int('BENCH_ROUNDS', 20)):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = request(url, data)
+            timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code in (200, 302), (
+            f'{url} ответил {response.status_code}'
+        )
+    return Measurement(
+        p50=percentile(timings, 0.5),
+        p95=percentile(timings, 0.95),
+        queries=len(queries),
+        size=len(response.content),
+    )
+
+
+def test_every_url_has_a_case():
+    names = {
+        f'{namespace}:{name}'
+        for namespace in ('blog', 'pages')
+        for name in get_resolver().namespace_dict[namespace][1].reverse_dict
+        if isinstance(name, str)
+    }
+    covered = {case.split()[0] for case in CASES}
+    assert names <= covered, (
+        f'Нет замеров для {sorted(names - covered)}: добавьте их в CASES.'
+    )
+
+
+@pytest.mark.parametrize('name', CASES)
+def test_view_budget(name, targets, budgets):
+    method, role, url, data = CASES[name]
+    result = measure(make_client(role, targets), method, url(targets), data)
+    RESULTS[name] = result
+    if os.environ.get('BENCH_UPDATE'):
+        return
+    budget = budgets.get(name)
+    if budget is None:
+        pytest.fail(
+            f'Нет бюджета для {name}: запустите с BENCH_UPDATE=1.'
+        )
+    assert result.queries <= budget['queries'], (
+        f'{name}: {result.queries} SQL-запросов, бюджет {budget["queries"]}.'
+    )
+    assert result.p95 <= budget['p95_ms'], (
+        f'{name}: p95 {result.p95:.1f} мс, бюджет {budget["p95_ms"]} мс.'
+    )
+    assert result.size <= budget['bytes'], (
+        f'{name}: ответ {result.size} байт, бюджет {budget["bytes"]}.'
+    )
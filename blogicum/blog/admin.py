@@ -1,10 +1,47 @@
 from django.contrib import admin
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 
+from .exporter import iter_gzip, iter_lines
 from .models import Category, Comment, Location, Post
 
 
+class ExportActionsMixin:
+    """
+    Действия выгрузки выбранных строк в сжатый NDJSON или CSV.
+
+    Ответ потоковый: строки читаются из базы пачками и сжимаются
+    по мере отправки, память не зависит от числа строк.
+    """
+
+    actions = ('export_ndjson', 'export_csv')
+
+    def export_response(self, queryset, data_format):
+        filename = '{}-{:%Y%m%d-%H%M%S}.{}.gz'.format(
+            self.model._meta.model_name, timezone.now(), data_format
+        )
+        response = StreamingHttpResponse(
+            iter_gzip(iter_lines(queryset.order_by('pk'), data_format)),
+            content_type='application/gzip'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{filename}"'
+        )
+        return response
+
+    @admin.action(
+        description='Выгрузить в NDJSON', permissions=('view',)
+    )
+    def export_ndjson(self, request, queryset):
+        return self.export_response(queryset, 'ndjson')
+
+    @admin.action(description='Выгрузить в CSV', permissions=('view',))
+    def export_csv(self, request, queryset):
+        return self.export_response(queryset, 'csv')
+
+
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(ExportActionsMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'author',
@@ -54,7 +91,7 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ExportActionsMixin, admin.ModelAdmin):
     list_display = (
         'text',
         'post',
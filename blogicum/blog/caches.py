@@ -0,0 +1,263 @@
+import hashlib
+import uuid
+from datetime import datetime
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+FEED_COUNT_PREFIX = 'feed-count'
+TAG_PREFIX = 'tag'
+PAGE_PREFIX = 'page'
+POST_CARD_PREFIX = 'post-card'
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+# Меняется при каждом сбросе тегов.
+GENERATION_KEY = f'{TAG_PREFIX}-generation'
+
+
+def index_count_key():
+    """Ключ кэша числа постов главной ленты."""
+    return f'{FEED_COUNT_PREFIX}:index'
+
+
+def category_count_key(category_id):
+    """Ключ кэша числа постов категории."""
+    return f'{FEED_COUNT_PREFIX}:category:{category_id}'
+
+
+def profile_count_key(author_id, owner=False):
+    """
+    Ключ кэша числа постов профиля.
+
+    Владелец видит и неопубликованные посты, поэтому для него
+    хранится отдельное значение.
+    """
+    key = f'{FEED_COUNT_PREFIX}:profile:{author_id}'
+    if owner:
+        key = f'{key}:owner'
+    return key
+
+
+def post_card_key(post_id):
+    """Ключ кэша отрисованной карточки поста."""
+    return f'{POST_CARD_PREFIX}:{post_id}'
+
+
+def index_feed_tag():
+    return 'feed:index'
+
+
+def category_feed_tag(category_id):
+    return f'feed:category:{category_id}'
+
+
+def profile_feed_tag(author_id):
+    return f'feed:profile:{author_id}'
+
+
+def object_tag(instance):
+    """Тег страниц, на которых выводится объект, например 'post:1'."""
+    return f'{instance._meta.model_name}:{instance.pk}'
+
+
+def post_tags(post):
+    """
+    Теги страниц с постом.
+
+    Кроме самого поста страница зависит от его автора, категории
+    и местоположения.
+    """
+    return (
+        f'post:{post.pk}',
+        f'user:{post.author_id}',
+        f'category:{post.category_id}',
+        f'location:{post.location_id}',
+    )
+
+
+def comment_tags(comments):
+    """Теги авторов комментариев: их имена выводятся рядом с текстом."""
+    return tuple(f'user:{comment.author_id}' for comment in comments)
+
+
+def _tag_key(tag):
+    return f'{TAG_PREFIX}:{tag}'
+
+
+def new_tag_version():
+    """
+    Новая версия тега.
+
+    Версия начинается со времени сброса: по нему строится
+    Last-Modified страниц, которые зависят от тега.
+    """
+    return f'{timezone.now().timestamp():f}:{uuid.uuid4().hex}'
+
+
+def tag_version_time(version):
+    """Время сброса тега; для версии без времени — текущее."""
+    try:
+        return datetime.fromtimestamp(
+            float(version.partition(':')[0]), tz=timezone.utc
+        )
+    except ValueError:
+        return timezone.now()
+
+
+def get_tag_versions(tags):
+    """
+    Текущие версии тегов.
+
+    Отсутствующие в кэше версии создаются, чтобы сохранённая
+    страница никогда не ссылалась на пустую версию.
+    """
+    keys = {_tag_key(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    missing = {
+        key: new_tag_version() for key in keys if key not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_tags(*tags):
+    """Сбрасывает все страницы, помеченные хотя бы одним из тегов."""
+    versions = {_tag_key(tag): new_tag_version() for tag in tags}
+    versions[GENERATION_KEY] = uuid.uuid4().hex
+    cache.set_many(versions, None)
+
+
+def invalidate_feeds(author_ids=(), category_ids=()):
+    """
+    Сбрасывает ленты, в которых мог появиться или пропасть пост.
+
+    Удаляются кэшированные счётчики и страницы главной ленты,
+    лент категорий и профилей авторов.
+    """
+    keys = [index_count_key()]
+    tags = [index_feed_tag()]
+    for category_id in category_ids:
+        if category_id is not None:
+            keys.append(category_count_key(category_id))
+            tags.append(category_feed_tag(category_id))
+    for author_id in author_ids:
+        keys.append(profile_count_key(author_id))
+        keys.append(profile_count_key(author_id, owner=True))
+        tags.append(profile_feed_tag(author_id))
+    cache.delete_many(keys)
+    bump_tags(*tags)
+
+
+def invalidate_posts(posts):
+    """
+    Сбрасывает страницы и ленты постов, изменённых без сигналов.
+
+    posts — объекты с полями id, author_id и category_id, например
+    результат PostQuerySet.refresh_visibility().
+    """
+    if not posts:
+        return
+    bump_tags(*(f'post:{post.id}' for post in posts))
+    invalidate_feeds(
+        author_ids={post.author_id for post in posts},
+        category_ids={post.category_id for post in posts}
+    )
+
+
+def add_cache_tags(request, *tags):
+    """Помечает кэшируемую страницу тегами, по которым её сбросить."""
+    cache_tags = getattr(request, '_cache_tags', None)
+    if cache_tags is not None:
+        cache_tags.update(tags)
+
+
+def add_post_cache_tags(request, posts):
+    for post in posts:
+        add_cache_tags(request, *post_tags(post))
+
+
+def _page_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'{PAGE_PREFIX}:{path}'
+
+
+def cache_page_for_anonymous(view):
+    """
+    Кэширует страницы для анонимных посетителей.
+
+    Представление помечает страницу тегами через add_cache_tags,
+    а сигналы при изменении данных меняют версию тегов. Сохранённая
+    страница отдаётся, только если версии всех её тегов не менялись;
+    вместе с ней хранятся ETag и Last-Modified, так что на условный
+    запрос из кэша сразу отдаётся 304.
+
+    Теги становятся известны только по ходу рендера, поэтому перед
+    вызовом представления запоминается GENERATION_KEY. Если за время
+    рендера какой-либо тег сбросили, страница могла собраться из
+    устаревших данных, и она не сохраняется.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or request.user.is_authenticated
+        ):
+            return view(request, *args, **kwargs)
+
+        key = _page_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            if get_tag_versions(entry['tags']) == entry['tags']:
+                response = HttpResponse(
+                    entry['content'],
+                    content_type=entry['content_type']
+                )
+                for header, value in entry.get('headers', {}).items():
+                    response[header] = value
+                return get_conditional_response(
+                    request,
+                    etag=response.get('ETag'),
+                    last_modified=parse_http_date_safe(
+                        response.get('Last-Modified', '')
+                    ),
+                    response=response
+                )
+
+        generation = cache.get(GENERATION_KEY)
+        request._cache_tags = set()
+        response = view(request, *args, **kwargs)
+
+        def store(response):
+            if response.status_code != 200 or response.streaming:
+                return
+            versions = get_tag_versions(request._cache_tags)
+            if cache.get(GENERATION_KEY) != generation:
+                return
+            cache.set(
+                key,
+                {
+                    'tags': versions,
+                    'content': response.content,
+                    'content_type': response['Content-Type'],
+                    'headers': {
+                        header: response[header]
+                        for header in VALIDATOR_HEADERS
+                        if response.has_header(header)
+                    },
+                },
+                settings.PAGE_CACHE_TIMEOUT
+            )
+
+        if getattr(response, 'is_rendered', True):
+            store(response)
+        else:
+            response.add_post_render_callback(store)
+        return response
+
+    return wrapper
@@ -0,0 +1,187 @@
+import hashlib
+from collections import namedtuple
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .caches import (
+    category_feed_tag,
+    get_tag_versions,
+    index_feed_tag,
+    post_tags,
+    profile_feed_tag,
+    tag_version_time,
+)
+from .models import Post
+from .registry import registry
+from core.constants import FEED_ORDERING, PAGINATE_LIMIT
+from core.utils import get_cursor_page
+
+WINDOW_FIELDS = (
+    'id', 'updated_at', 'author_id', 'category_id', 'location_id'
+)
+
+
+class WindowRow(namedtuple('WindowRow', WINDOW_FIELDS)):
+    """Поля поста, от которых зависит его карточка, без создания модели."""
+
+    @property
+    def pk(self):
+        return self.id
+
+
+def feed_window(queryset, params):
+    """
+    Посты, которые попадут на страницу ленты, без самих страниц.
+
+    Повторяет выбор окна get_paginator: по курсору или по номеру
+    страницы, но без подсчёта числа постов. Для номера, который нельзя
+    проверить без подсчёта (например, 'last'), возвращает None.
+    """
+    queryset = queryset.values_list(*WINDOW_FIELDS)
+    if params.get('cursor') or not settings.FEED_NUMBERED_PAGES:
+        rows = get_cursor_page(queryset, params)
+    else:
+        try:
+            number = int(params.get('page', 1))
+        except (TypeError, ValueError):
+            return None
+        if number < 1:
+            return None
+        offset = (number - 1) * PAGINATE_LIMIT
+        rows = queryset.order_by(
+            *FEED_ORDERING
+        )[offset:offset + PAGINATE_LIMIT]
+    return [WindowRow._make(row) for row in rows]
+
+
+def make_validators(request, posts, tags):
+    """
+    Валидаторы ETag и Last-Modified страницы с постами posts.
+
+    В ETag входят пользователь, id и updated_at постов и версии тегов
+    кэша: так валидатор меняется и при правке автора, категории или
+    местоположения, которая не трогает updated_at поста. Last-Modified
+    — самое позднее из updated_at и времён сброса тегов: удаление,
+    снятие с публикации или переименование не трогают updated_at
+    оставшихся на странице постов, но сбрасывают теги.
+    """
+    tags = set(tags)
+    for post in posts:
+        tags.update(post_tags(post))
+    versions = sorted(get_tag_versions(tags).items())
+    state = repr((
+        request.user.pk,
+        [(post.id, post.updated_at.isoformat()) for post in posts],
+        versions,
+    ))
+    etag = hashlib.md5(state.encode()).hexdigest()
+    last_modified = max(
+        [post.updated_at for post in posts]
+        + [tag_version_time(version) for _, version in versions],
+        default=None
+    )
+    return etag, last_modified
+
+
+def set_validators(request, posts, tags=()):
+    """Запоминает валидаторы построенной страницы для заголовков ответа."""
+    request._validators = make_validators(request, posts, tags)
+
+
+def conditional_page(get_validators):
+    """
+    Поддержка If-None-Match и If-Modified-Since.
+
+    Если клиент прислал валидаторы, get_validators(request, *args,
+    **kwargs) одним небольшим запросом вычисляет текущие (etag,
+    last_modified) или возвращает None, если дёшево это сделать нельзя.
+    При совпадении ответ 304 отдаётся, не строя страницу. Заголовки
+    ETag и Last-Modified обычного ответа представление задаёт через
+    set_validators по уже загруженным постам, без лишнего запроса.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method in ('GET', 'HEAD') and (
+                'HTTP_IF_NONE_MATCH' in request.META
+                or 'HTTP_IF_MODIFIED_SINCE' in request.META
+            ):
+                validators = get_validators(request, *args, **kwargs)
+                if validators is not None:
+                    response = get_conditional_response(
+                        request, *header_values(*validators)
+                    )
+                    if response is not None:
+                        return response
+            response = view(request, *args, **kwargs)
+            validators = getattr(request, '_validators', None)
+            if validators is not None and response.status_code == 200:
+                etag, last_modified = header_values(*validators)
+                response.headers.setdefault('ETag', etag)
+                if last_modified is not None:
+                    response.headers.setdefault(
+                        'Last-Modified', http_date(last_modified)
+                    )
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def header_values(etag, last_modified):
+    """Валидаторы в виде, который ждёт get_conditional_response."""
+    if last_modified is not None:
+        last_modified = int(last_modified.timestamp())
+    return quote_etag(etag), last_modified
+
+
+def index_validators(request):
+    posts = feed_window(Post.published_posts.all(), request.GET)
+    if posts is None:
+        return None
+    return make_validators(request, posts, (index_feed_tag(),))
+
+
+def category_validators(request, category_slug):
+    category = registry.published_category(category_slug)
+    if category is None:
+        return None
+    posts = feed_window(category.posts.published(), request.GET)
+    if not posts:
+        return None
+    return make_validators(request, posts, (category_feed_tag(category.id),))
+
+
+def profile_validators(request, username):
+    posts = Post.objects.filter(author__username=username)
+    if request.user.get_username() != username:
+        posts = posts.published()
+    posts = feed_window(posts, request.GET)
+    if not posts:
+        return None
+    return make_validators(
+        request, posts, (profile_feed_tag(posts[0].author_id),)
+    )
+
+
+def post_validators(request, post_id):
+    """
+    Валидаторы страницы поста.
+
+    updated_at поста меняется и при добавлении, правке или удалении
+    комментария, а переименование автора комментария сбрасывает тег
+    поста, поэтому отдельный запрос к комментариям не нужен.
+    """
+    post = Post.objects.filter(pk=post_id).values_list(
+        *WINDOW_FIELDS, 'is_visible'
+    ).first()
+    if post is None:
+        return None
+    post, is_visible = WindowRow._make(post[:-1]), post[-1]
+    if not is_visible and post.author_id != request.user.id:
+        return None
+    return make_validators(request, (post,), ())
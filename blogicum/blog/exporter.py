@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from .models import Comment, Post
+from core.constants import EXPORT_CHUNK_SIZE
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+GZIP_BUFFER_SIZE = 64 * 1024
+
+EXPORT_FIELDS = {
+    Post: (
+        'id',
+        'title',
+        'text',
+        'pub_date',
+        'created_at',
+        'updated_at',
+        'is_published',
+        # Все массовые смены видимости (планировщик, переключение
+        # категории) обновляют и updated_at, см. PostQuerySet.
+        'is_visible',
+        'author_id',
+        'category_id',
+        'location_id',
+        'image',
+        'comment_count',
+    ),
+    Comment: (
+        'id',
+        'post_id',
+        'author_id',
+        'text',
+        'created_at',
+    ),
+}
+DATASETS = {
+    'posts': Post,
+    'comments': Comment,
+}
+
+
+def changed_between(model, since=None, until=None):
+    """
+    Строки model, изменённые в промежутке (since, until].
+
+    У поста момент изменения — updated_at. У комментария своего поля
+    нет (см. blog.models.Comment), но его правка обновляет updated_at
+    поста, поэтому берутся новые комментарии и все комментарии
+    изменённых постов: выгрузка может повторить строку, но не
+    пропустит правку.
+    """
+    queryset = model.objects.order_by('pk')
+    if model is Post:
+        field_conditions = ('updated_at',)
+    else:
+        field_conditions = ('created_at', 'post__updated_at')
+    if since is not None:
+        condition = Q()
+        for field in field_conditions:
+            condition |= Q(**{f'{field}__gt': since})
+        queryset = queryset.filter(condition)
+    if until is not None:
+        queryset = queryset.filter(**{f'{field_conditions[0]}__lte': until})
+    return queryset
+
+
+def iter_lines(
+        queryset, data_format, chunk_size=EXPORT_CHUNK_SIZE, on_record=None
+):
+    """
+    Строки выгрузки queryset в формате 'ndjson' или 'csv'.
+
+    Строки читаются из базы через iterator() пачками по chunk_size
+    и сразу превращаются в текст, поэтому расход памяти не зависит
+    от размера таблицы. CSV начинается со строки заголовков.
+    on_record, если задан, вызывается на каждую выгруженную запись.
+    """
+    fields = EXPORT_FIELDS[queryset.model]
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    if on_record is not None:
+        rows = counted(rows, on_record)
+    if data_format == 'ndjson':
+        for row in rows:
+            yield json.dumps(
+                dict(zip(fields, row)), cls=DjangoJSONEncoder,
+                ensure_ascii=False
+            ) + '\n'
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def csv_line(row):
+        writer.writerow(row)
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    yield csv_line(fields)
+    for row in rows:
+        yield csv_line(row)
+
+
+def counted(rows, on_record):
+    for row in rows:
+        on_record()
+        yield row
+
+
+def iter_gzip(lines, level=6):
+    """Сжимает строки в поток gzip, отдавая его частями."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    pending = []
+    size = 0
+    for line in lines:
+        data = line.encode()
+        pending.append(data)
+        size += len(data)
+        if size >= GZIP_BUFFER_SIZE:
+            chunk = compressor.compress(b''.join(pending))
+            pending, size = [], 0
+            if chunk:
+                yield chunk
+    yield compressor.compress(b''.join(pending)) + compressor.flush()
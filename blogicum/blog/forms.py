@@ -1,13 +1,69 @@
+from functools import partial
+
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserChangeForm
+from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceIterator
 
 from .models import Comment, Post
+from .registry import registry
 
 
 User = get_user_model()
 
 
+class RegistryChoiceIterator(ModelChoiceIterator):
+    """Варианты выбора из справочника в памяти, без запросов к базе."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in self.field.get_objects():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(self.field.get_objects()) + (
+            1 if self.field.empty_label is not None else 0
+        )
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(
+            self.field.get_objects()
+        )
+
+
+class RegistryChoiceField(forms.ModelChoiceField):
+    """
+    Выбор категории или местоположения по справочнику registry.
+
+    get_objects возвращает все варианты, get_object — объект по pk
+    или None.
+    """
+
+    iterator = RegistryChoiceIterator
+
+    def __init__(self, *args, get_objects, get_object, **kwargs):
+        self.get_objects = get_objects
+        self.get_object = get_object
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.queryset.model):
+            value = value.pk
+        try:
+            obj = self.get_object(int(value))
+        except (TypeError, ValueError):
+            obj = None
+        if obj is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'], code='invalid_choice'
+            )
+        return obj
+
+
 class PostForm(forms.ModelForm):
     """Форма 'Поста'."""
 
@@ -21,6 +77,18 @@ class PostForm(forms.ModelForm):
             'category',
             'image'
         )
+        field_classes = {
+            'category': partial(
+                RegistryChoiceField,
+                get_objects=registry.categories,
+                get_object=registry.category
+            ),
+            'location': partial(
+                RegistryChoiceField,
+                get_objects=registry.locations,
+                get_object=registry.location
+            ),
+        }
         widgets = {
             'pub_date': forms.DateTimeInput(
                 attrs={
@@ -0,0 +1,191 @@
+import datetime
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .caches import bump_tags, post_card_key
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = 'variants'
+
+_executor = None
+
+
+def get_executor():
+    """
+    Пул потоков для нарезки изображений, создаётся при первой задаче.
+
+    Задачи живут только в памяти процесса: при штатном завершении
+    интерпретатор дожидается очереди, но если процесс убит, она
+    теряется. Поэтому первой задачей нового пула идёт
+    sweep_missing_variants, которая доделывает брошенную нарезку.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.POST_IMAGE_WORKERS,
+            thread_name_prefix='post-images'
+        )
+        _executor.submit(_sweep_in_worker)
+    return _executor
+
+
+def variant_name(name, width):
+    """
+    Путь уменьшенной копии: posts_images/variants/<имя>_<ширина>.jpg.
+
+    Имя оригинала берётся целиком, с расширением: иначе копии
+    cat.png и cat.jpg разных постов совпали бы и перезаписывали
+    друг друга.
+    """
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, VARIANTS_DIR, f'{filename}_{width}.jpg')
+
+
+def make_variants(name):
+    """
+    Сохраняет уменьшенные копии изображения.
+
+    Копии нужны только для ширин из POST_IMAGE_VARIANTS, меньших
+    ширины оригинала: увеличивать изображение смысла нет.
+
+    Возвращаемое значение:
+        dict: размеры оригинала и список копий с путём и размерами.
+    """
+    with default_storage.open(name) as file:
+        image = Image.open(file)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    width, height = image.size
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    variants = []
+    for variant_width in sorted(set(settings.POST_IMAGE_VARIANTS.values())):
+        if variant_width >= width:
+            break
+        variant_height = round(height * variant_width / width)
+        resized = image.resize(
+            (variant_width, variant_height), Image.Resampling.LANCZOS
+        )
+        buffer = BytesIO()
+        resized.save(
+            buffer, 'JPEG', quality=settings.POST_IMAGE_QUALITY,
+            optimize=True, progressive=True
+        )
+        path = variant_name(name, variant_width)
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        variants.append({
+            'name': default_storage.save(path, ContentFile(buffer.getvalue())),
+            'width': variant_width,
+            'height': variant_height,
+        })
+    return {'width': width, 'height': height, 'variants': variants}
+
+
+def build_post_variants(post_id, name):
+    """
+    Нарезает изображение поста и сохраняет результат в image_variants.
+
+    Обновление идёт через QuerySet.update с условием на имя файла:
+    если изображение успели заменить, устаревшие копии не запишутся.
+    Сигналы при этом не срабатывают, поэтому карточка и страницы
+    поста сбрасываются здесь.
+
+    Возвращаемое значение:
+        bool: записан ли результат.
+    """
+    from .models import Post
+
+    image_variants = make_variants(name)
+    updated = Post.objects.filter(pk=post_id, image=name).update(
+        image_variants=image_variants,
+        updated_at=timezone.now()
+    )
+    if updated:
+        cache.delete(post_card_key(post_id))
+        bump_tags(f'post:{post_id}')
+    return bool(updated)
+
+
+def missing_variants(older_than=None):
+    """
+    (id, имя файла) постов с изображением, но без копий.
+
+    older_than отсекает посты, изменённые недавно: их нарезка,
+    скорее всего, ещё в очереди.
+    """
+    from .models import Post
+
+    posts = Post.objects.exclude(image='').filter(image_variants={})
+    if older_than is not None:
+        posts = posts.filter(updated_at__lt=timezone.now() - older_than)
+    return posts.values_list('id', 'image')
+
+
+def sweep_missing_variants():
+    """
+    Нарезает изображения, задачи которых потерялись.
+
+    Возвращаемое значение:
+        int: число записанных результатов.
+    """
+    built = 0
+    for post_id, name in missing_variants(
+        datetime.timedelta(seconds=settings.POST_IMAGE_SWEEP_DELAY)
+    ).iterator():
+        try:
+            built += build_post_variants(post_id, name)
+        except OSError:
+            logger.exception(
+                'Не удалось нарезать изображение %s поста %s', name, post_id
+            )
+    return built
+
+
+def _sweep_in_worker():
+    try:
+        sweep_missing_variants()
+    except Exception:
+        logger.exception('Не удалось проверить копии изображений')
+    finally:
+        connections.close_all()
+
+
+def _run_in_worker(post_id, name):
+    try:
+        build_post_variants(post_id, name)
+    except Exception:
+        logger.exception(
+            'Не удалось нарезать изображение %s поста %s', name, post_id
+        )
+    finally:
+        connections.close_all()
+
+
+def schedule_post_variants(post):
+    """
+    Ставит нарезку изображения поста в очередь после коммита.
+
+    Запрос не ждёт Pillow: задача уходит в пул потоков. При
+    POST_IMAGE_WORKERS = 0 копии создаются синхронно.
+    """
+    post_id, name = post.pk, post.image.name
+
+    def submit():
+        if settings.POST_IMAGE_WORKERS:
+            get_executor().submit(_run_in_worker, post_id, name)
+        else:
+            build_post_variants(post_id, name)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,395 @@
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from itertools import chain
+
+from django.contrib.auth import get_user_model
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max, Model
+from django.utils import timezone
+
+from .caches import invalidate_feeds
+from .models import Category, Comment, Location, Post
+from .registry import registry
+from .search import index_posts
+from .text import make_excerpt, render_text_html
+from core.constants import IMPORT_BATCH_SIZE
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\r\n'
+
+# Поля, которые импорт вычисляет сам, а не берёт из файла.
+DERIVED_FIELDS = {
+    'blog.post': (
+        'text_html', 'excerpt', 'comment_count', 'is_visible', 'updated_at'
+    ),
+}
+
+
+def iter_ndjson(chunks):
+    """Объекты из NDJSON: по одному JSON на строку, пустые пропускаются."""
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+def _skip_whitespace(chunks, buffer, position):
+    """Позиция первого значимого символа, при необходимости дочитывает."""
+    while True:
+        while position < len(buffer) and buffer[position] in WHITESPACE:
+            position += 1
+        if position < len(buffer):
+            return buffer, position
+        buffer, position = next(chunks, ''), 0
+        if not buffer:
+            raise ValueError('JSON-массив не закрыт.')
+
+
+def _decode(decoder, chunks, buffer):
+    """
+    Первое значение из buffer и остаток после него.
+
+    Части дочитываются, пока значение не разберётся целиком: число
+    в конце части может продолжаться в следующей.
+    """
+    while True:
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as error:
+            item, end, last_error = None, None, error
+        if end is not None and end < len(buffer):
+            return item, buffer[end:]
+        chunk = next(chunks, '')
+        if not chunk:
+            if end is None:
+                raise last_error
+            return item, ''
+        buffer += chunk
+
+
+def iter_json_array(chunks):
+    """
+    Элементы JSON-массива верхнего уровня, например файла dumpdata.
+
+    Массив читается частями: в памяти держится только текущая часть
+    и разбираемый элемент, а не весь файл.
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter(chunks)
+    buffer, position = _skip_whitespace(chunks, '', 0)
+    if buffer[position] != '[':
+        raise ValueError('Ожидался JSON-массив.')
+    buffer, position = _skip_whitespace(chunks, buffer, position + 1)
+    if buffer[position] == ']':
+        return
+    while True:
+        item, buffer = _decode(decoder, chunks, buffer[position:])
+        yield item
+        buffer, position = _skip_whitespace(chunks, buffer, 0)
+        if buffer[position] == ']':
+            return
+        if buffer[position] != ',':
+            raise ValueError('Ожидалась запятая между элементами.')
+        buffer, position = _skip_whitespace(chunks, buffer, position + 1)
+
+
+def iter_records(stream, data_format='auto'):
+    """
+    Записи из потока в формате 'json', 'ndjson' или 'auto'.
+
+    В режиме 'auto' формат определяется по первому символу:
+    '[' означает JSON-массив, иначе NDJSON.
+    """
+    first = stream.read(CHUNK_SIZE)
+    chunks = chain((first,), iter(lambda: stream.read(CHUNK_SIZE), ''))
+    if data_format == 'auto':
+        data_format = 'json' if first.lstrip().startswith('[') else 'ndjson'
+    if data_format == 'json':
+        return iter_json_array(chunks)
+    return iter_ndjson(chunks)
+
+
+@contextmanager
+def keep_created_at(*models):
+    """
+    Отключает auto_now_add, чтобы bulk_create сохранил даты из файла.
+
+    Иначе bulk_create заменил бы created_at текущим временем.
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def lock_tables(models):
+    """
+    Запрещает другим соединениям запись в таблицы до конца транзакции.
+
+    Тогда id, назначенные от максимального id таблицы, не совпадут
+    с id строк, вставленных параллельно. В SQLite блокировка записи
+    общая на всю базу и берётся первой пишущей командой.
+    """
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('LOCK TABLE {} IN SHARE ROW EXCLUSIVE MODE'.format(
+                ', '.join(quote(model._meta.db_table) for model in models)
+            ))
+        elif connection.vendor == 'sqlite':
+            model = next(iter(models))
+            column = quote(model._meta.pk.column)
+            cursor.execute(
+                f'UPDATE {quote(model._meta.db_table)} '
+                f'SET {column} = {column} WHERE 0'
+            )
+
+
+class BlogImporter:
+    """
+    Загрузка пользователей, справочников, постов и комментариев.
+
+    Записи в формате dumpdata ({'model', 'pk', 'fields'}) копятся
+    в памяти и вставляются через bulk_create пачками по batch_size,
+    каждая пачка в своей транзакции. id назначаются при вставке
+    пачки, от максимального id таблицы под блокировкой lock_tables,
+    а внешние ключи переводятся из id файла в id базы по словарям
+    в памяти, без запросов. Пока пачка не вставлена, вместо id
+    в словарях лежит сам объект. Пользователи с уже существующим
+    username и категории с уже существующим slug не создаются
+    заново, а сопоставляются.
+
+    Запись, ссылающаяся на ещё не прочитанный объект, ждёт его
+    в памяти; быстрее всего файл, где пользователи и справочники
+    идут раньше постов, а посты раньше комментариев.
+
+    bulk_create не вызывает сигналы, поэтому finish() сам заполняет
+    is_visible и comment_count, индексирует посты для поиска
+    и сбрасывает кэши. Вызывать его нужно и после ошибки: уже
+    вставленные пачки тоже нуждаются в этом.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, on_flush=None):
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        user_model = get_user_model()
+        # Порядок важен: пачка вставляется от родителей к потомкам.
+        self.models = {
+            model._meta.label_lower: model
+            for model in (user_model, Category, Location, Post, Comment)
+        }
+        self.relations = {
+            label: [
+                field for field in model._meta.concrete_fields
+                if field.is_relation
+            ]
+            for label, model in self.models.items()
+        }
+        self.ids = {label: {} for label in self.models}
+        self.natural_keys = {
+            user_model._meta.label_lower: (
+                user_model.USERNAME_FIELD,
+                dict(user_model.objects.values_list(
+                    user_model.USERNAME_FIELD, 'pk'
+                ))
+            ),
+            Category._meta.label_lower: (
+                'slug', dict(Category.objects.values_list('slug', 'pk'))
+            ),
+        }
+        self.first_post_id = None
+        self.pending = {label: [] for label in self.models}
+        self.pending_count = 0
+        # Ссылки на объекты, которые ещё не вставлены.
+        self.links = []
+        self.unsaved_keys = []
+        self.waiting = defaultdict(list)
+        self.created = Counter()
+        self.matched = Counter()
+        self.skipped = Counter()
+        self.author_ids = set()
+        self.category_ids = set()
+        self.started = time.monotonic()
+
+    @property
+    def unresolved(self):
+        """Число записей, так и не дождавшихся объектов по ссылкам."""
+        return sum(len(records) for records in self.waiting.values())
+
+    def add(self, record):
+        """Принимает одну запись файла."""
+        label = str(record.get('model', '')).lower()
+        if label not in self.models:
+            self.skipped[label] += 1
+            return
+        fields = record.get('fields', {})
+        for field in self.relations[label]:
+            value = fields.get(field.name)
+            target = field.related_model._meta.label_lower
+            if value is not None and value not in self.ids[target]:
+                self.waiting[target, value].append(record)
+                return
+        self._add(label, record.get('pk'), fields)
+
+    def _add(self, label, source_pk, fields):
+        pk = None
+        if label in self.natural_keys:
+            key_field, known = self.natural_keys[label]
+            pk = known.get(fields.get(key_field))
+        if pk is not None:
+            self.matched[label] += 1
+        else:
+            pk = self._build(label, fields)
+            if label in self.natural_keys:
+                key_field, known = self.natural_keys[label]
+                known[getattr(pk, key_field)] = pk
+                self.unsaved_keys.append((known, getattr(pk, key_field)))
+            self.pending[label].append(pk)
+            self.pending_count += 1
+        if source_pk is not None:
+            self.ids[label][source_pk] = pk
+            if isinstance(pk, Model):
+                self.unsaved_keys.append((self.ids[label], source_pk))
+            for record in self.waiting.pop((label, source_pk), ()):
+                self.add(record)
+        if self.pending_count >= self.batch_size:
+            self.flush()
+
+    def _build(self, label, fields):
+        model = self.models[label]
+        obj = model()
+        derived = DERIVED_FIELDS.get(label, ())
+        for field in model._meta.concrete_fields:
+            if field.primary_key or field.name in derived:
+                continue
+            if field.name not in fields:
+                if getattr(field, 'auto_now_add', False):
+                    setattr(obj, field.attname, timezone.now())
+                continue
+            value = fields[field.name]
+            if field.is_relation:
+                target = field.related_model._meta.label_lower
+                value = self.ids[target].get(value)
+                if isinstance(value, Model):
+                    self.links.append((obj, field.attname, value))
+                    continue
+            else:
+                value = field.to_python(value)
+            setattr(obj, field.attname, value)
+        if model is Post:
+            obj.text_html = render_text_html(obj.text)
+            obj.excerpt = make_excerpt(obj.text)
+        return obj
+
+    def _assign_ids(self):
+        for label, objects in self.pending.items():
+            if objects:
+                last = self.models[label].objects.aggregate(
+                    last=Max('pk')
+                )['last'] or 0
+                for pk, obj in enumerate(objects, last + 1):
+                    obj.pk = pk
+        for obj, attname, target in self.links:
+            setattr(obj, attname, target.pk)
+
+    def _insert(self):
+        for label, objects in self.pending.items():
+            if objects:
+                self.models[label].objects.bulk_create(
+                    objects, batch_size=self.batch_size
+                )
+
+    def flush(self):
+        """
+        Вставляет накопленные записи одной транзакцией.
+
+        Если вставка не удалась, пачка отбрасывается: повторный
+        flush() или finish() её уже не вставит.
+        """
+        if not self.pending_count:
+            return
+        try:
+            with keep_created_at(*self.models.values()):
+                with transaction.atomic():
+                    lock_tables(self.models.values())
+                    self._assign_ids()
+                    self._insert()
+            self._committed()
+        finally:
+            for objects in self.pending.values():
+                objects.clear()
+            self.pending_count = 0
+            self.links.clear()
+            self.unsaved_keys.clear()
+        if self.on_flush is not None:
+            self.on_flush(self)
+
+    def _committed(self):
+        for label, objects in self.pending.items():
+            self.created[label] += len(objects)
+        posts = self.pending[Post._meta.label_lower]
+        if posts and self.first_post_id is None:
+            self.first_post_id = posts[0].pk
+        for post in posts:
+            self.author_ids.add(post.author_id)
+            self.category_ids.add(post.category_id)
+        for mapping, key in self.unsaved_keys:
+            mapping[key] = mapping[key].pk
+
+    def finish(self):
+        """
+        Вставляет остаток и заполняет то, что обычно делают сигналы.
+
+        Производные поля заполняются для всех уже вставленных пачек,
+        даже если вставка остатка не удалась. Счётчики id
+        в PostgreSQL сдвигаются за вставленные явно id.
+        """
+        try:
+            self.flush()
+        finally:
+            self._finalize()
+
+    def _finalize(self):
+        with transaction.atomic():
+            if self.first_post_id is not None:
+                posts = Post.objects.filter(pk__gte=self.first_post_id)
+                posts.refresh_visibility()
+                posts.recount_comments()
+                index_posts(posts)
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(
+                    no_style(), list(self.models.values())
+                ):
+                    cursor.execute(sql)
+            if (
+                self.created[Category._meta.label_lower]
+                or self.created[Location._meta.label_lower]
+            ):
+                registry.invalidate()
+        invalidate_feeds(
+            author_ids=self.author_ids, category_ids=self.category_ids
+        )
+
+    @property
+    def total(self):
+        return sum(self.created.values())
+
+    def rate(self):
+        """Вставленных записей в секунду с начала импорта."""
+        elapsed = time.monotonic() - self.started
+        return self.total / elapsed if elapsed else 0.0
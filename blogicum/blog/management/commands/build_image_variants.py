@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import build_post_variants, missing_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Нарезает уменьшенные копии изображений постов, у которых их '
+        'нет, например если задача потерялась при перезапуске процесса.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересоздать копии и у постов, где они уже есть.'
+        )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            posts = Post.objects.exclude(image='').values_list('id', 'image')
+        else:
+            posts = missing_variants()
+        built = failed = 0
+        for post_id, name in posts.iterator():
+            try:
+                build_post_variants(post_id, name)
+            except OSError as error:
+                failed += 1
+                self.stderr.write(f'Пост {post_id}, {name}: {error}')
+            else:
+                built += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано изображений: {built}')
+        )
+        if failed:
+            self.stdout.write(
+                self.style.WARNING(f'С ошибками: {failed}')
+            )
@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+
+from blog.models import Category, Post
+from core.constants import COMMENT_ORDERING, FEED_ORDERING, PAGINATE_LIMIT
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает EXPLAIN QUERY PLAN запросов лент и комментариев '
+        'на текущей базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Перед разбором собрать статистику командой ANALYZE.'
+        )
+
+    def feed_querysets(self):
+        """Запросы в том виде, в каком их выполняют представления."""
+        yield 'index', Post.published_posts.for_feed().order_by(
+            *FEED_ORDERING
+        )
+        category = Category.objects.filter(is_published=True).first()
+        if category:
+            yield 'category', category.posts.published().for_feed(
+            ).order_by(*FEED_ORDERING)
+        author = User.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        if author:
+            yield 'profile', author.posts.published().for_feed(
+            ).order_by(*FEED_ORDERING)
+            yield 'profile_owner', author.posts.for_feed().order_by(
+                *FEED_ORDERING
+            )
+        post = Post.objects.order_by('-comment_count').first()
+        if post:
+            yield 'comments', post.comments.select_related(
+                'author'
+            ).order_by(*COMMENT_ORDERING)
+
+    def handle(self, *args, **options):
+        if options['analyze']:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        for name, queryset in self.feed_querysets():
+            plan = queryset[:PAGINATE_LIMIT + 1].explain()
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for line in plan.splitlines():
+                style = self.style.WARNING if (
+                    'TEMP B-TREE' in line or line.split()[3:4] == ['SCAN']
+                ) else str
+                self.stdout.write(f'  {style(line)}')
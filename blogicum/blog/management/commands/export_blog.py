@@ -0,0 +1,117 @@
+import gzip
+import os
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog.exporter import (
+    DATASETS,
+    EXPORT_FORMATS,
+    changed_between,
+    iter_lines,
+)
+from core.constants import EXPORT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты или комментарии в NDJSON или CSV, '
+        'целиком или только изменённые после отметки времени.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=tuple(DATASETS))
+        parser.add_argument(
+            '--format',
+            choices=EXPORT_FORMATS,
+            default='ndjson',
+            help='Формат строк выгрузки.'
+        )
+        parser.add_argument(
+            '--output',
+            help=(
+                'Файл выгрузки; .gz в конце включает сжатие gzip, '
+                '«-» — стандартный вывод. По умолчанию '
+                '<dataset>.<format>.gz.'
+            )
+        )
+        parser.add_argument(
+            '--since',
+            help='Выгрузить только строки, изменённые после этого момента.'
+        )
+        parser.add_argument(
+            '--watermark',
+            help=(
+                'Файл с отметкой прошлой выгрузки: без --since она '
+                'берётся отсюда, после выгрузки записывается новая.'
+            )
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Сколько строк читать из базы за раз.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        watermark = options['watermark'] and Path(options['watermark'])
+        since = options['since']
+        if since is None and watermark and watermark.exists():
+            since = watermark.read_text().strip()
+        if since is not None:
+            since = self.parse_moment(since)
+        until = timezone.now()
+        queryset = changed_between(DATASETS[options['dataset']], since, until)
+        exported = 0
+
+        def count_record():
+            nonlocal exported
+            exported += 1
+
+        lines = iter_lines(
+            queryset, options['format'], chunk_size=options['chunk_size'],
+            on_record=count_record
+        )
+        output = options['output'] or (
+            f'{options["dataset"]}.{options["format"]}.gz'
+        )
+        if output == '-':
+            self.write(lambda line: self.stdout.write(line, ending=''), lines)
+        else:
+            self.write_file(output, lines)
+        if watermark:
+            watermark.write_text(until.isoformat())
+        self.stderr.write(self.style.SUCCESS(
+            f'Выгружено строк: {exported}'
+        ))
+
+    def parse_moment(self, value):
+        moment = parse_datetime(value)
+        if moment is None:
+            raise CommandError(f'Некорректная отметка времени: {value}')
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    def write(self, write, lines):
+        for line in lines:
+            write(line)
+
+    def write_file(self, path, lines):
+        """Пишет во временный файл и переименовывает его после успеха."""
+        partial = f'{path}.part'
+        if path.endswith('.gz'):
+            stream = gzip.open(partial, 'wt', encoding='utf-8', newline='')
+        else:
+            stream = open(partial, 'w', encoding='utf-8', newline='')
+        try:
+            with stream:
+                self.write(stream.write, lines)
+        except BaseException:
+            os.remove(partial)
+            raise
+        os.replace(partial, path)
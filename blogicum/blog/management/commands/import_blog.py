@@ -0,0 +1,80 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.importer import BlogImporter, iter_records
+from core.constants import IMPORT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает пользователей, категории, местоположения, посты '
+        'и комментарии из JSON (формат dumpdata) или NDJSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Файл с данными; «-» — стандартный ввод.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=('auto', 'json', 'ndjson'),
+            default='auto',
+            help='Формат файла; по умолчанию определяется по содержимому.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help='Сколько записей вставлять одной транзакцией.'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        importer = BlogImporter(
+            batch_size=options['batch_size'],
+            on_flush=self.report_progress if options['verbosity'] > 1
+            else None
+        )
+        try:
+            if options['path'] == '-':
+                self.load(importer, sys.stdin, options['format'])
+            else:
+                try:
+                    with open(options['path'], encoding='utf-8') as stream:
+                        self.load(importer, stream, options['format'])
+                except OSError as error:
+                    raise CommandError(error)
+        finally:
+            # Уже вставленным пачкам нужны производные поля и при ошибке.
+            importer.finish()
+        for label, created in importer.created.items():
+            self.stdout.write(f'{label}: создано {created}')
+        for label, matched in importer.matched.items():
+            self.stdout.write(f'{label}: уже были в базе {matched}')
+        for label, skipped in importer.skipped.items():
+            self.stdout.write(f'{label}: пропущено {skipped}')
+        if importer.unresolved:
+            self.stdout.write(self.style.WARNING(
+                'Не найдены объекты по ссылкам, пропущено записей: '
+                f'{importer.unresolved}'
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано записей: {importer.total} '
+            f'({importer.rate():.0f} записей/с)'
+        ))
+
+    def load(self, importer, stream, data_format):
+        try:
+            for record in iter_records(stream, data_format):
+                importer.add(record)
+        except ValueError as error:
+            raise CommandError(f'Некорректные данные: {error}')
+
+    def report_progress(self, importer):
+        self.stdout.write(
+            f'Вставлено записей: {importer.total} '
+            f'({importer.rate():.0f} записей/с)'
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from blog.caches import invalidate_posts
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает в лентах отложенные посты, время публикации которых '
+        'наступило. Запускается планировщиком, например cron, раз в минуту.'
+    )
+
+    def handle(self, *args, **options):
+        changed = Post.objects.publish_due()
+        invalidate_posts(changed)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлена видимость постов: {len(changed)}')
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев всех постов.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Post.objects.recount_comments()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано постов: {updated}')
+        )
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from blog.importer import BlogImporter
+from blog.seeding import SeedGenerator
+from core.constants import IMPORT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей, категории, местоположения, '
+        'посты и комментарии для нагрузочного тестирования.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ('users', 1000, 'Число пользователей.'),
+            ('categories', 20, 'Число категорий.'),
+            ('locations', 50, 'Число местоположений.'),
+            ('posts', 10000, 'Число постов.'),
+            ('comments', 50000, 'Число комментариев.'),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default, help=help_text
+            )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help=(
+                'Начальное значение генератора: '
+                'те же параметры — те же данные.'
+            )
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help='Сколько записей вставлять одной транзакцией.'
+        )
+
+    def handle(self, *args, **options):
+        counts = {
+            name: options[name] for name in (
+                'users', 'categories', 'locations', 'posts', 'comments'
+            )
+        }
+        if any(count < 0 for count in counts.values()):
+            raise CommandError(
+                'Количество объектов не может быть меньше нуля.'
+            )
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        if counts['posts'] and not counts['users']:
+            raise CommandError('Для постов нужен хотя бы один пользователь.')
+        importer = BlogImporter(
+            batch_size=options['batch_size'],
+            on_flush=self.report_progress if options['verbosity'] > 1
+            else None
+        )
+        generator = SeedGenerator(options['seed'], timezone.now())
+        for record in generator.records(**counts):
+            importer.add(record)
+        importer.finish()
+        for label, created in importer.created.items():
+            self.stdout.write(f'{label}: создано {created}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано записей: {importer.total} '
+            f'({importer.rate():.0f} записей/с)'
+        ))
+
+    def report_progress(self, importer):
+        self.stdout.write(
+            f'Вставлено записей: {importer.total} '
+            f'({importer.rate():.0f} записей/с)'
+        )
@@ -1,9 +1,144 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.db.models.query import QuerySet
 from django.utils import timezone
 
+FEED_FIELDS = (
+    'title',
+    'excerpt',
+    'pub_date',
+    'is_published',
+    'image',
+    'image_variants',
+    'comment_count',
+    'updated_at',
+    'author',
+    'author__username',
+    'category',
+    'location',
+)
+# Поля, по которым вызывающий код сбрасывает кэши изменённых постов.
+CHANGED_FIELDS = ('id', 'author_id', 'category_id')
 
-class PublishedPostManager(models.Manager):
+
+def visibility_condition():
+    """
+    Условие видимости поста в лентах.
+
+    Пост опубликован, время публикации наступило и категория
+    опубликована. Результат хранится в Post.is_visible.
+    """
+    return Q(
+        is_published=True,
+        pub_date__lte=timezone.now(),
+        category__is_published=True
+    )
+
+
+class PostQuerySet(QuerySet):
+    """QuerySet публикаций."""
+
+    def published(self) -> QuerySet:
+        """
+        Опубликованные посты.
+
+        Фильтр по материализованному флагу is_visible: без JOIN с
+        категорией и без текущего времени в запросе.
+        """
+        return self.filter(is_visible=True)
+
+    def refresh_visibility(self) -> list:
+        """
+        Приводит is_visible постов в соответствие с условием видимости.
+
+        Обновление идёт через QuerySet.update, сигналы не срабатывают,
+        поэтому кэши сбрасывает вызывающий код. updated_at меняется
+        вместе с флагом, чтобы смену видимости заметили валидаторы
+        страниц и инкрементальная выгрузка.
+
+        Возвращаемое значение:
+            list: (id, author_id, category_id) изменённых постов.
+        """
+        condition = visibility_condition()
+        shown = list(
+            self.filter(condition, is_visible=False).values_list(
+                *CHANGED_FIELDS, named=True
+            )
+        )
+        hidden = list(
+            self.exclude(condition).filter(is_visible=True).values_list(
+                *CHANGED_FIELDS, named=True
+            )
+        )
+        for posts, is_visible in ((shown, True), (hidden, False)):
+            self._set_visibility(posts, is_visible)
+        return shown + hidden
+
+    def publish_due(self) -> list:
+        """
+        Показывает отложенные посты, время публикации которых наступило.
+
+        Скрывают посты сигналы при сохранении поста и категории,
+        поэтому здесь проверяются только скрытые опубликованные посты
+        с наступившим pub_date; их выбирает частичный индекс
+        post_scheduled_idx, а не просмотр всей таблицы.
+
+        Возвращаемое значение:
+            list: (id, author_id, category_id) показанных постов.
+        """
+        posts = list(
+            self.filter(
+                is_visible=False,
+                is_published=True,
+                pub_date__lte=timezone.now(),
+                category__is_published=True
+            ).values_list(*CHANGED_FIELDS, named=True)
+        )
+        self._set_visibility(posts, True)
+        return posts
+
+    def _set_visibility(self, posts, is_visible):
+        if posts:
+            self.model.objects.filter(
+                pk__in=[post.id for post in posts]
+            ).update(is_visible=is_visible, updated_at=timezone.now())
+
+    def recount_comments(self) -> int:
+        """
+        Пересчитывает comment_count по таблице комментариев.
+
+        Возвращаемое значение:
+            int: число обновлённых постов.
+        """
+        from .models import Comment
+
+        return self.update(
+            comment_count=Coalesce(
+                Subquery(
+                    Comment.objects.filter(
+                        post=OuterRef('pk')
+                    ).order_by().values('post').annotate(
+                        total=Count('pk')
+                    ).values('total')
+                ),
+                0
+            )
+        )
+
+    def for_feed(self) -> QuerySet:
+        """
+        Посты для карточек ленты.
+
+        Автор подтягивается JOIN, категорию и местоположение после
+        выборки подставляет registry.attach; загружаются только поля,
+        которые выводит includes/post_card.html, — вместо полного
+        текста его начало excerpt.
+        """
+        return self.select_related('author').only(*FEED_FIELDS)
+
+
+class PublishedPostManager(models.Manager.from_queryset(PostQuerySet)):
     """
     Менеджер.
 
@@ -11,8 +146,4 @@ class PublishedPostManager(models.Manager):
     """
 
     def get_queryset(self) -> QuerySet:
-        return super().get_queryset().filter(
-            pub_date__lte=timezone.now(),
-            is_published=True,
-            category__is_published=True
-        )
+        return super().get_queryset().published()
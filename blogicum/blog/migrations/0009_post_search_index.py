@@ -0,0 +1,44 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:13
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Таблица FTS5 с копией заголовка и текста постов.
+
+    Таблица хранит собственную копию текста (а не external content):
+    для удаления строки из индекса не нужны её прежние значения, а
+    пересоздание blog_post миграциями SQLite её не затрагивает.
+    Заголовок весит в ранжировании в десять раз больше текста.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE blog_post_fts USING fts5('
+        'title, text, tokenize="unicode61 remove_diacritics 2")'
+    )
+    schema_editor.execute(
+        "INSERT INTO blog_post_fts(blog_post_fts, rank) "
+        "VALUES ('rank', 'bm25(10.0, 1.0)')"
+    )
+    schema_editor.execute(
+        'INSERT INTO blog_post_fts(rowid, title, text) '
+        'SELECT id, title, text FROM blog_post'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['author', 'pub_date'], name='post_author_visible_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:27
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+EXCERPT_WORDS = 10
+EXCERPT_MAX_LENGTH = 256
+
+
+# Копии blog.text на момент миграции: её результат не должен
+# меняться вместе с кодом приложения.
+def render_text_html(text):
+    return linebreaksbr(text, autoescape=True)
+
+
+def make_excerpt(text):
+    return Truncator(
+        Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    ).chars(EXCERPT_MAX_LENGTH)
+
+
+def fill_rendered_text(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    batch = []
+    for post in Post.objects.only('text').iterator(chunk_size=BATCH_SIZE):
+        post.text_html = render_text_html(post.text)
+        post.excerpt = make_excerpt(post.text)
+        batch.append(post)
+        if len(batch) == BATCH_SIZE:
+            Post.objects.bulk_update(batch, ('text_html', 'excerpt'))
+            batch = []
+    Post.objects.bulk_update(batch, ('text_html', 'excerpt'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_author_visible_feed_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=256, verbose_name='Начало текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(fill_rendered_text, migrations.RunPython.noop),
+    ]
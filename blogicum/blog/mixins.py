@@ -6,11 +6,21 @@ class UserTestCastomMixin(LoginRequiredMixin, UserPassesTestMixin):
     """
     Миксин проверки пользователя.
 
-    Проверка пользователя и реализация редиректа.
+    Проверка пользователя и реализация редиректа. Объект загружается
+    один раз за запрос: test_func, handle_no_permission,
+    get_success_url и сам UpdateView/DeleteView получают один и тот же
+    экземпляр.
     """
 
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
     def test_func(self):
-        return self.get_object().author == self.request.user
+        return self.get_object().author_id == self.request.user.id
 
     def handle_no_permission(self):
         return redirect(
@@ -0,0 +1,147 @@
+import logging
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceRegistry:
+    """
+    Справочники категорий и местоположений в памяти процесса.
+
+    Таблицы маленькие и меняются редко, поэтому загружаются целиком.
+    Актуальность проверяется по версии в файле REGISTRY_VERSION_FILE,
+    общем для всех процессов: сигналы записывают туда новую версию
+    при любом изменении справочника, и каждый процесс перечитывает
+    таблицы при следующем обращении. Кэш процесса для этого не
+    годится, он у каждого процесса свой. Если файл недоступен или
+    процессы на разных машинах, таблицы всё равно перечитываются
+    не реже раза в REGISTRY_TTL секунд.
+
+    Объекты общие для всех запросов процесса, изменять их нельзя.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+
+    def _load(self, version):
+        from .models import Category, Location
+
+        categories = {
+            category.pk: category
+            for category in Category.objects.order_by('pk')
+        }
+        return {
+            'version': version,
+            'loaded_at': time.monotonic(),
+            'categories': categories,
+            'categories_by_slug': {
+                category.slug: category
+                for category in categories.values()
+            },
+            'locations': {
+                location.pk: location
+                for location in Location.objects.order_by('pk')
+            },
+        }
+
+    def _read_version(self):
+        try:
+            with open(settings.REGISTRY_VERSION_FILE) as file:
+                return file.read()
+        except FileNotFoundError:
+            return ''
+        except OSError:
+            logger.warning(
+                'Версия справочника недоступна', exc_info=True
+            )
+            return None
+
+    def _write_version(self):
+        path = settings.REGISTRY_VERSION_FILE
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, 'w') as file:
+                file.write(uuid.uuid4().hex)
+            os.replace(temp_path, path)
+        except OSError:
+            logger.warning(
+                'Не удалось записать версию справочника', exc_info=True
+            )
+
+    def _is_stale(self, state, version):
+        return (
+            state is None
+            or state['version'] != version
+            or time.monotonic() - state['loaded_at'] > settings.REGISTRY_TTL
+        )
+
+    def _get_state(self):
+        version = self._read_version()
+        state = self._state
+        if self._is_stale(state, version):
+            with self._lock:
+                state = self._state
+                if self._is_stale(state, version):
+                    state = self._state = self._load(version)
+        return state
+
+    def categories(self):
+        return list(self._get_state()['categories'].values())
+
+    def locations(self):
+        return list(self._get_state()['locations'].values())
+
+    def category(self, pk):
+        return self._get_state()['categories'].get(pk)
+
+    def location(self, pk):
+        return self._get_state()['locations'].get(pk)
+
+    def published_category(self, slug):
+        """Опубликованная категория по slug или None."""
+        category = self._get_state()['categories_by_slug'].get(slug)
+        if category is not None and category.is_published:
+            return category
+        return None
+
+    def attach(self, posts):
+        """
+        Подставляет постам категории и местоположения из справочника.
+
+        После этого обращение к post.category и post.location не
+        обращается к базе, а запросу ленты не нужны их JOIN.
+        """
+        state = self._get_state()
+        for post in posts:
+            for field, objects in (
+                ('category', state['categories']),
+                ('location', state['locations']),
+            ):
+                obj = objects.get(getattr(post, f'{field}_id'))
+                if obj is not None:
+                    post._meta.get_field(field).set_cached_value(post, obj)
+        return posts
+
+    def invalidate(self):
+        """
+        Сбрасывает справочник во всех процессах.
+
+        Версия меняется сразу и ещё раз после коммита: иначе процесс,
+        успевший перечитать таблицы до коммита, запомнил бы старые
+        данные с новой версией. Свои данные процесс сбрасывает сам,
+        даже если файл версии записать не удалось.
+        """
+        self._state = None
+        self._write_version()
+        transaction.on_commit(self._write_version)
+
+
+registry = ReferenceRegistry()
@@ -0,0 +1,122 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'blog_post_fts'
+SEARCH_ORDERING = ('rank', 'id')
+
+
+def search_available():
+    """Полнотекстовый индекс FTS5 есть только у SQLite."""
+    return connection.vendor == 'sqlite'
+
+
+def index_post(post):
+    """Добавляет пост в индекс или обновляет его."""
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', (post.pk,)
+        )
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE}(rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            (post.pk, post.title, post.text)
+        )
+
+
+def unindex_post(post_id):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', (post_id,)
+        )
+
+
+def index_posts(queryset):
+    """
+    Добавляет в индекс посты из queryset одним запросом.
+
+    Посты должны отсутствовать в индексе, например только что
+    созданные через bulk_create.
+
+    Возвращаемое значение:
+        int: число проиндексированных постов.
+    """
+    if not search_available():
+        return 0
+    sql, params = queryset.order_by().values_list(
+        'id', 'title', 'text'
+    ).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE}(rowid, title, text) {sql}', params
+        )
+        return cursor.rowcount
+
+
+def rebuild_search_index():
+    """
+    Перестраивает индекс по всем постам.
+
+    Возвращаемое значение:
+        int: число проиндексированных постов.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE}(rowid, title, text) '
+            'SELECT id, title, text FROM blog_post'
+        )
+        return cursor.rowcount
+
+
+def build_match_query(text):
+    """
+    Превращает строку пользователя в запрос MATCH.
+
+    Каждое слово берётся в кавычки, поэтому синтаксис FTS5 во вводе
+    не интерпретируется; слова объединяются через AND, последнее
+    ищется как префикс.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_posts(queryset, text):
+    """
+    Посты из queryset, подходящие под запрос.
+
+    Добавляет аннотацию rank (меньше — релевантнее) для сортировки
+    и курсорной пагинации по SEARCH_ORDERING.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return queryset.none().annotate(
+            rank=Value(0, output_field=FloatField())
+        )
+    if not search_available():
+        condition = Q()
+        for word in words:
+            condition &= Q(title__icontains=word) | Q(text__icontains=word)
+        return queryset.filter(condition).annotate(
+            rank=Value(0, output_field=FloatField())
+        )
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[
+            f'{SEARCH_TABLE}.rowid = blog_post.id',
+            f'{SEARCH_TABLE} MATCH %s',
+        ],
+        params=[build_match_query(text)]
+    ).annotate(
+        rank=RawSQL(f'{SEARCH_TABLE}.rank', ())
+    )
@@ -0,0 +1,190 @@
+import random
+from array import array
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from faker import Faker
+
+SEED_PASSWORD = 'seed-password'
+VOCABULARY_SIZE = 3000
+NAMES_COUNT = 300
+# Доли неопубликованных постов, отложенных постов и скрытых категорий.
+UNPUBLISHED_SHARE = 0.03
+SCHEDULED_SHARE = 0.02
+HIDDEN_CATEGORY_SHARE = 0.1
+# Показатель закона Ципфа: чем больше, тем сильнее перекос.
+ZIPF_EXPONENT = 1.1
+HISTORY_DAYS = 3 * 365
+
+
+def zipf_cum_weights(count, exponent=ZIPF_EXPONENT):
+    """Накопленные веса рангов 1..count по закону Ципфа для choices()."""
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+class SeedGenerator:
+    """
+    Синтетические данные блога в формате записей dumpdata.
+
+    Всё случайное берётся из random.Random(seed) и Faker с тем же
+    seed, поэтому одинаковые параметры дают одинаковые данные; даты
+    отсчитываются от now. Авторы, категории и число комментариев
+    у поста распределены по закону Ципфа: немногие авторы пишут
+    большую часть постов, немногие посты собирают большую часть
+    комментариев.
+    """
+
+    def __init__(self, seed, now):
+        self.rng = random.Random(seed)
+        self.now = now
+        fake = Faker('ru_RU')
+        fake.seed_instance(seed)
+        self.vocabulary = sorted(set(fake.words(VOCABULARY_SIZE)))
+        self.first_names = [fake.first_name() for _ in range(NAMES_COUNT)]
+        self.last_names = [fake.last_name() for _ in range(NAMES_COUNT)]
+        self.cities = sorted({fake.city() for _ in range(NAMES_COUNT)})
+        self.password = make_password(SEED_PASSWORD, salt=f'seed{seed}')
+
+    def words(self, low, high):
+        return ' '.join(
+            self.rng.choices(self.vocabulary, k=self.rng.randint(low, high))
+        )
+
+    def sentence(self):
+        return self.words(4, 14).capitalize() + '.'
+
+    def paragraph(self):
+        return ' '.join(
+            self.sentence() for _ in range(self.rng.randint(1, 6))
+        )
+
+    def moment(self):
+        """Случайный момент за последние HISTORY_DAYS дней."""
+        return self.now - timedelta(
+            days=self.rng.uniform(0, HISTORY_DAYS)
+        )
+
+    def records(self, users, categories, locations, posts, comments):
+        yield from self.users(users)
+        yield from self.categories(categories)
+        yield from self.locations(locations)
+        pub_dates = array('d')
+        yield from self.posts(posts, users, categories, locations, pub_dates)
+        yield from self.comments(comments, users, pub_dates)
+
+    def users(self, count):
+        for pk in range(1, count + 1):
+            yield {
+                'model': 'auth.user',
+                'pk': pk,
+                'fields': {
+                    'username': f'seed_user_{pk}',
+                    'first_name': self.rng.choice(self.first_names),
+                    'last_name': self.rng.choice(self.last_names),
+                    'email': f'seed_user_{pk}@example.com',
+                    'password': self.password,
+                    'date_joined': self.moment(),
+                },
+            }
+
+    def categories(self, count):
+        for pk in range(1, count + 1):
+            yield {
+                'model': 'blog.category',
+                'pk': pk,
+                'fields': {
+                    'title': self.words(1, 3).capitalize(),
+                    'description': self.paragraph(),
+                    'slug': f'seed-category-{pk}',
+                    'is_published': (
+                        self.rng.random() >= HIDDEN_CATEGORY_SHARE
+                    ),
+                },
+            }
+
+    def locations(self, count):
+        for pk in range(1, count + 1):
+            yield {
+                'model': 'blog.location',
+                'pk': pk,
+                'fields': {'name': self.rng.choice(self.cities)},
+            }
+
+    def posts(self, count, users, categories, locations, pub_dates):
+        """
+        Посты; моменты публикации складываются в pub_dates.
+
+        Часть постов снята с публикации, часть отложена в будущее.
+        """
+        authors = zipf_cum_weights(users)
+        topics = zipf_cum_weights(categories)
+        for pk in range(1, count + 1):
+            pub_date = self.moment()
+            if self.rng.random() < SCHEDULED_SHARE:
+                pub_date = self.now + timedelta(
+                    days=self.rng.uniform(1, 30)
+                )
+            pub_dates.append(pub_date.timestamp())
+            yield {
+                'model': 'blog.post',
+                'pk': pk,
+                'fields': {
+                    'title': self.words(2, 8).capitalize(),
+                    'text': '\n\n'.join(
+                        self.paragraph()
+                        for _ in range(self.rng.randint(1, 5))
+                    ),
+                    'pub_date': pub_date,
+                    'created_at': pub_date - timedelta(
+                        hours=self.rng.uniform(0, 48)
+                    ),
+                    'is_published': self.rng.random() >= UNPUBLISHED_SHARE,
+                    'author': self.pick(users, authors),
+                    'category': self.pick(categories, topics),
+                    'location': (
+                        self.rng.randint(1, locations)
+                        if locations and self.rng.random() < 0.5 else None
+                    ),
+                },
+            }
+
+    def comments(self, count, users, pub_dates):
+        """
+        Комментарии без pk: на них ничто не ссылается, и импорту
+        не нужно помнить их id.
+        """
+        if not pub_dates:
+            return
+        # Популярность поста не должна зависеть от его id.
+        ranking = list(range(1, len(pub_dates) + 1))
+        self.rng.shuffle(ranking)
+        popularity = zipf_cum_weights(len(ranking))
+        authors = zipf_cum_weights(users)
+        for _ in range(count):
+            post = ranking[self.pick(len(ranking), popularity) - 1]
+            published = pub_dates[post - 1]
+            created_at = self.now - timedelta(
+                seconds=self.rng.uniform(
+                    0, max(self.now.timestamp() - published, 0)
+                )
+            )
+            yield {
+                'model': 'blog.comment',
+                'fields': {
+                    'text': self.sentence(),
+                    'post': post,
+                    'author': self.pick(users, authors),
+                    'created_at': created_at,
+                },
+            }
+
+    def pick(self, count, cum_weights):
+        """Номер от 1 до count с накопленными весами cum_weights."""
+        if not count:
+            return None
+        return self.rng.choices(
+            range(1, count + 1), cum_weights=cum_weights
+        )[0]
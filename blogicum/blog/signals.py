@@ -0,0 +1,295 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caches import (
+    bump_tags,
+    invalidate_feeds,
+    invalidate_posts,
+    object_tag,
+    post_card_key,
+)
+from .images import schedule_post_variants
+from .models import Category, Comment, Location, Post
+from .registry import registry
+from .search import index_post, unindex_post
+from .text import make_excerpt, render_text_html
+from core.metrics import inc as inc_metric
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+PUBLICATION_FIELDS = {
+    Post: ('is_published', 'pub_date', 'category_id', 'author_id'),
+    Category: ('is_published',),
+}
+
+
+def publication_state(instance):
+    """
+    Поля объекта, от которых зависит состав лент.
+
+    Читаются из __dict__, чтобы не подгружать отложенные поля.
+    """
+    return {
+        field: instance.__dict__.get(field)
+        for field in PUBLICATION_FIELDS[type(instance)]
+    }
+
+
+@receiver(post_init, sender=Post)
+@receiver(post_init, sender=Category)
+def remember_publication_state(sender, instance, **kwargs):
+    instance._publication_state = publication_state(instance)
+
+
+@receiver(pre_save, sender=Post)
+def render_text(sender, instance, **kwargs):
+    """Готовит HTML текста и начало текста для карточки."""
+    if 'text' in instance.__dict__:
+        instance.text_html = render_text_html(instance.text)
+        instance.excerpt = make_excerpt(instance.text)
+
+
+@receiver(pre_save, sender=Post)
+def update_visibility(sender, instance, **kwargs):
+    """
+    Пересчитывает Post.is_visible перед сохранением.
+
+    Наступление отложенной даты публикации отслеживает команда
+    publish_scheduled.
+    """
+    instance.is_visible = (
+        instance.is_published
+        and instance.pub_date <= timezone.now()
+        and instance.category_id is not None
+        and category_is_published(instance)
+    )
+
+
+def category_is_published(post):
+    if Post.category.is_cached(post):
+        return post.category.is_published
+    return Category.objects.filter(
+        pk=post.category_id, is_published=True
+    ).exists()
+
+
+@receiver(post_save, sender=Post)
+def invalidate_on_post_save(sender, instance, created, **kwargs):
+    """Сбрасывает страницы поста, а при смене публикации — и ленты."""
+    bump_tags(object_tag(instance))
+    cache.delete(post_card_key(instance.pk))
+    old = instance._publication_state
+    new = publication_state(instance)
+    instance._publication_state = new
+    if not created and old == new:
+        return
+    invalidate_feeds(
+        author_ids={old['author_id'], new['author_id']} - {None},
+        category_ids={old['category_id'], new['category_id']}
+    )
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_on_post_delete(sender, instance, **kwargs):
+    bump_tags(object_tag(instance))
+    cache.delete(post_card_key(instance.pk))
+    invalidate_feeds(
+        author_ids=(instance.author_id,),
+        category_ids=(instance.category_id,)
+    )
+
+
+@receiver(post_save, sender=Category)
+def invalidate_on_category_save(sender, instance, created, **kwargs):
+    bump_tags(object_tag(instance))
+    old = instance._publication_state
+    instance._publication_state = publication_state(instance)
+    if not created and old != instance._publication_state:
+        invalidate_feeds(category_ids=(instance.pk,))
+        invalidate_posts(
+            Post.objects.filter(category=instance).refresh_visibility()
+        )
+
+
+@receiver(post_delete, sender=Category)
+def invalidate_on_category_delete(sender, instance, **kwargs):
+    """
+    Сбрасывает страницы категории и скрывает её посты.
+
+    К этому моменту у постов уже очищена ссылка на категорию.
+    """
+    bump_tags(object_tag(instance))
+    invalidate_feeds(category_ids=(instance.pk,))
+    invalidate_posts(
+        Post.objects.filter(
+            category__isnull=True, is_visible=True
+        ).refresh_visibility()
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_registry(sender, **kwargs):
+    """Справочник категорий и местоположений перечитается из базы."""
+    registry.invalidate()
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_object_pages(sender, instance, **kwargs):
+    """Сбрасывает страницы, на которых выводится объект."""
+    bump_tags(object_tag(instance))
+
+
+@receiver(post_save, sender=User)
+def invalidate_commented_posts(sender, instance, created, update_fields,
+                               **kwargs):
+    """
+    Сбрасывает страницы постов, где пользователь оставлял комментарии.
+
+    Рядом с комментарием выводится имя автора, а валидаторы страницы
+    поста строятся по тегам самого поста. Сохранения, которые имени
+    не касаются (например, last_login при входе), пропускаются.
+    """
+    if created or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    post_ids = Comment.objects.filter(author=instance).values_list(
+        'post_id', flat=True
+    ).distinct()
+    tags = [f'post:{post_id}' for post_id in post_ids]
+    if tags:
+        bump_tags(*tags)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_on_comment_change(sender, instance, **kwargs):
+    """
+    Сбрасывает страницы, на которых выводится пост комментария.
+
+    Это страница поста и страницы лент с его счётчиком комментариев.
+    """
+    bump_tags(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, **kwargs):
+    """Обновляет пост в полнотекстовом индексе."""
+    index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+def image_name(instance):
+    """Имя файла изображения или None, если поле не загружено."""
+    value = instance.__dict__.get('image')
+    return getattr(value, 'name', value)
+
+
+@receiver(post_init, sender=Post)
+def remember_image(sender, instance, **kwargs):
+    instance._image_name = image_name(instance)
+
+
+@receiver(pre_save, sender=Post)
+def reset_image_variants(sender, instance, raw, **kwargs):
+    """Копии старого изображения не подходят к новому."""
+    if not raw and 'image' in instance.__dict__:
+        if image_name(instance) != instance._image_name:
+            instance.image_variants = {}
+
+
+@receiver(post_save, sender=Post)
+def build_image_variants(sender, instance, raw, **kwargs):
+    """Нарезает новое изображение поста в фоне после коммита."""
+    if raw or 'image' not in instance.__dict__:
+        return
+    instance._image_name = image_name(instance)
+    if instance.image and not instance.image_variants:
+        schedule_post_variants(instance)
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    """
+    Увеличивает счётчик комментариев поста при добавлении комментария.
+
+    При правке комментария обновляется только updated_at поста: от него
+    зависят валидаторы условных запросов страницы поста.
+    При загрузке фикстур (raw) счётчик не трогаем — его восстанавливает
+    команда recount_comments.
+    """
+    if kwargs.get('raw'):
+        return
+    posts = Post.objects.filter(pk=instance.post_id)
+    if created:
+        posts.update(
+            comment_count=F('comment_count') + 1,
+            updated_at=timezone.now()
+        )
+    else:
+        posts.update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """
+    Уменьшает счётчик комментариев поста при удалении комментария.
+
+    Срабатывает и при каскадном удалении, например вместе с автором.
+    """
+    Post.objects.filter(
+        pk=instance.post_id,
+        comment_count__gt=0
+    ).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=timezone.now()
+    )
+
+
+def count_write(model, action):
+    """
+    Считает запись в метриках.
+
+    Запись в базу к этому моменту уже прошла, поэтому ошибка файла
+    метрик только логируется.
+    """
+    try:
+        inc_metric(
+            'blogicum_writes_total',
+            model=model._meta.model_name,
+            action=action
+        )
+    except OSError:
+        logger.exception('Не удалось записать метрику изменения')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def count_writes(sender, instance, created, **kwargs):
+    count_write(sender, 'created' if created else 'updated')
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def count_deletes(sender, instance, **kwargs):
+    count_write(sender, 'deleted')
@@ -0,0 +1,40 @@
+from django import template
+
+from core.constants import PAGES_ON_EACH_SIDE, PAGES_ON_ENDS
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page_obj):
+    """
+    Номера страниц вокруг текущей: первые, соседние и последние.
+
+    Пропуски обозначены Paginator.ELLIPSIS, так что число ссылок не
+    зависит от длины ленты.
+    """
+    return list(page_obj.paginator.get_elided_page_range(
+        page_obj.number,
+        on_each_side=PAGES_ON_EACH_SIDE,
+        on_ends=PAGES_ON_ENDS
+    ))
+
+
+@register.simple_tag(takes_context=True)
+def query_string(context, **params):
+    """
+    Строка запроса для ссылок пагинатора.
+
+    Сохраняет остальные параметры текущего запроса (например, 'q'
+    страницы поиска), параметры навигации заменяются переданными;
+    параметр со значением None удаляется.
+    """
+    query = context['request'].GET.copy()
+    for name in ('page', 'cursor'):
+        query.pop(name, None)
+    for name, value in params.items():
+        if value is not None:
+            query[name] = value
+    if not query:
+        return context['request'].path
+    return f'?{query.urlencode()}'
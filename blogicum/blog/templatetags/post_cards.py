@@ -0,0 +1,56 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.html import format_html_join
+from django.utils.safestring import mark_safe
+
+from blog.caches import post_card_key
+
+register = template.Library()
+
+
+def card_version(post):
+    """
+    Версия карточки поста.
+
+    Сам пост при сохранении сбрасывает свою карточку сигналом, а
+    сюда входит то, что меняется без его сохранения: счётчик
+    комментариев, автор, категория и местоположение.
+    """
+    category, location = post.category, post.location
+    return (
+        post.comment_count,
+        post.author.username,
+        category and (category.slug, category.title, category.is_published),
+        location and (location.name, location.is_published),
+    )
+
+
+@register.simple_tag
+def post_cards(posts):
+    """
+    Выводит карточки постов ленты.
+
+    Все карточки страницы запрашиваются из кэша одним get_many,
+    шаблон рендерится только для промахов.
+    """
+    posts = list(posts)
+    cached = cache.get_many([post_card_key(post.pk) for post in posts])
+    cards, misses = [], {}
+    for post in posts:
+        version = card_version(post)
+        entry = cached.get(post_card_key(post.pk))
+        if entry is not None and entry[0] == version:
+            card = entry[1]
+        else:
+            card = render_to_string(
+                'includes/post_card.html', {'post': post}
+            )
+            misses[post_card_key(post.pk)] = (version, card)
+        cards.append((mark_safe(card),))
+    if misses:
+        cache.set_many(misses, settings.POST_CARD_CACHE_TIMEOUT)
+    return format_html_join(
+        '\n', '<article class="mb-5">\n{}\n</article>', cards
+    )
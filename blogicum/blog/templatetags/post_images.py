@@ -0,0 +1,54 @@
+from django import template
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+register = template.Library()
+
+IMAGE_CLASS = 'border-3 rounded img-fluid img-thumbnail mb-2 mx-auto d-block'
+IMAGE_SIZES = '(max-width: 40rem) 100vw, 40rem'
+
+
+def image_sources(post):
+    """
+    Все доступные копии изображения поста по возрастанию ширины.
+
+    Оригинал идёт последним. Пока копии не нарезаны, известен
+    только он, и то без размеров.
+    """
+    data = post.image_variants or {}
+    sources = [
+        (default_storage.url(variant['name']),
+         variant['width'], variant['height'])
+        for variant in data.get('variants', ())
+    ]
+    sources.append((post.image.url, data.get('width'), data.get('height')))
+    return sources
+
+
+@register.simple_tag
+def post_image(post, variant='card'):
+    """
+    Тег <img> изображения поста с srcset, width и height.
+
+    В src попадает наименьшая копия не уже варианта из
+    POST_IMAGE_VARIANTS, остальные браузер выбирает сам по srcset.
+    """
+    sources = image_sources(post)
+    wanted = settings.POST_IMAGE_VARIANTS[variant]
+    src, width, height = next(
+        (source for source in sources
+         if source[1] is None or source[1] >= wanted),
+        sources[-1]
+    )
+    if width is None:
+        return format_html(
+            '<img class="{}" src="{}" alt="{}">', IMAGE_CLASS, src, post.title
+        )
+    srcset = ', '.join(f'{url} {w}w' for url, w, _ in sources)
+    return format_html(
+        '<img class="{}" src="{}" srcset="{}" sizes="{}" '
+        'width="{}" height="{}" alt="{}" loading="{}">',
+        IMAGE_CLASS, src, srcset, IMAGE_SIZES, width, height, post.title,
+        'lazy' if variant == 'card' else 'eager'
+    )
@@ -0,0 +1,22 @@
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+from core.constants import MAX_LENGTH
+
+EXCERPT_WORDS = 10
+
+
+def render_text_html(text):
+    """HTML текста поста, как его выводил фильтр linebreaksbr."""
+    return linebreaksbr(text, autoescape=True)
+
+
+def make_excerpt(text):
+    """
+    Начало текста для карточки, как фильтр truncatewords:10.
+
+    Очень длинные слова дополнительно обрезаются до MAX_LENGTH символов.
+    """
+    return Truncator(
+        Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    ).chars(MAX_LENGTH)
@@ -35,6 +35,11 @@ urlpatterns = [
         views.CommentDeleteView.as_view(),
         name='delete_comment'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
@@ -55,6 +60,11 @@ urlpatterns = [
         views.PostDetailView.as_view(),
         name='post_detail'
     ),
+    path(
+        'search/',
+        views.search,
+        name='search'
+    ),
     path(
         'category/<slug:category_slug>/',
         views.category_posts,
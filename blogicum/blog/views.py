@@ -1,7 +1,7 @@
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Q
+from django.db import transaction
 from django.views.generic import (
     ListView,
     CreateView,
@@ -9,30 +9,68 @@ from django.views.generic import (
     DeleteView,
     DetailView,
 )
-from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.urls import reverse_lazy
-from django.http import HttpRequest, HttpResponse
+from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
 
+from .caches import (
+    add_cache_tags,
+    add_post_cache_tags,
+    cache_page_for_anonymous,
+    category_count_key,
+    category_feed_tag,
+    comment_tags,
+    index_count_key,
+    index_feed_tag,
+    object_tag,
+    post_tags,
+    profile_count_key,
+    profile_feed_tag,
+)
+from .conditional import (
+    category_validators,
+    conditional_page,
+    index_validators,
+    post_validators,
+    profile_validators,
+    set_validators,
+)
 from .mixins import UserTestCastomMixin
-from .models import Category, Post, Comment
+from .registry import registry
+from .models import Post, Comment
 from .forms import PostForm, EditProfileForm, CommentForm
-from core.constants import PAGINATE_LIMIT
-from core.utils import get_paginator
+from .search import SEARCH_ORDERING, search_posts
+from core.constants import COMMENT_ORDERING, COMMENTS_PAGINATE_LIMIT
+from core.utils import get_cursor_page, get_paginator
 
 
+@method_decorator(cache_page_for_anonymous, name='dispatch')
+@method_decorator(conditional_page(index_validators), name='dispatch')
 class PostListView(ListView):
     """Главная страница сайта."""
 
     template_name = 'blog/index.html'
     model = Post
-    queryset = Post.published_posts.annotate(
-        comment_count=Count('comments')
-    )
-    ordering = '-pub_date'
-    paginate_by = PAGINATE_LIMIT
 
+    def get_queryset(self):
+        return Post.published_posts.for_feed()
+
+    def get_context_data(self, **kwargs):
+        page_obj = get_paginator(
+            self.object_list,
+            self.request.GET,
+            count_key=index_count_key()
+        )
+        registry.attach(page_obj)
+        add_cache_tags(self.request, index_feed_tag())
+        add_post_cache_tags(self.request, page_obj)
+        set_validators(self.request, page_obj, (index_feed_tag(),))
+        return super().get_context_data(page_obj=page_obj, **kwargs)
 
+
+@method_decorator(cache_page_for_anonymous, name='dispatch')
+@method_decorator(conditional_page(post_validators), name='dispatch')
 class PostDetailView(DetailView):
     """Подробная информация о посте"""
 
@@ -43,27 +81,64 @@ class PostDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related(
-                'author'
-            )
-        )
+        context['comments'] = get_comments_page(self.request, self.object.pk)
+        add_cache_tags(self.request, *post_tags(self.object))
+        set_validators(self.request, (self.object,))
         return context
 
     def get_object(self, queryset=None):
-        return get_object_or_404(
-            self.model.objects.filter(
-                Q(author_id=self.request.user.id)
-                | Q(pub_date__lte=timezone.now())
-                & Q(is_published=True)
-                & Q(category__is_published=True)
-            ),
+        post = get_object_or_404(
+            self.model.objects.select_related('author'),
             pk=self.kwargs[
                 self.pk_url_kwarg
             ]
         )
+        if not post.is_visible_to(self.request.user):
+            raise Http404
+        return registry.attach([post])[0]
+
+
+def get_comments_page(request, post_id):
+    """
+    Страница комментариев поста по курсору (created_at, id).
+
+    Помечает кэшируемую страницу тегами авторов комментариев.
+    """
+    comments = get_cursor_page(
+        Comment.objects.filter(post_id=post_id).select_related('author'),
+        request.GET,
+        ordering=COMMENT_ORDERING,
+        per_page=COMMENTS_PAGINATE_LIMIT
+    )
+    add_cache_tags(request, *comment_tags(comments))
+    return comments
+
 
+@cache_page_for_anonymous
+def post_comments(request, post_id):
+    """
+    Фрагмент со следующей порцией комментариев поста.
 
+    Кнопка «Показать ещё» подгружает его вместо себя.
+    """
+    post = get_object_or_404(
+        Post.objects.only('is_visible', 'author_id'), pk=post_id
+    )
+    if not post.is_visible_to(request.user):
+        raise Http404
+    add_cache_tags(request, f'post:{post_id}')
+    return render(
+        request,
+        'includes/comment_list.html',
+        {
+            'post_id': post_id,
+            'comments': get_comments_page(request, post_id),
+        }
+    )
+
+
+@cache_page_for_anonymous
+@conditional_page(category_validators)
 def category_posts(request: HttpRequest, category_slug: str) -> HttpResponse:
     """
     Возвращает посты по категории.
@@ -71,55 +146,86 @@ def category_posts(request: HttpRequest, category_slug: str) -> HttpResponse:
     Возвращаемое значение:
         HttpResponse: информация о постах по запрашиваемой категории.
     """
-    category = get_object_or_404(
-        Category,
-        slug=category_slug,
-        is_published=True
+    category = registry.published_category(category_slug)
+    if category is None:
+        raise Http404
+    page_obj = get_paginator(
+        category.posts.published().for_feed(),
+        request.GET,
+        count_key=category_count_key(category.id)
+    )
+    registry.attach(page_obj)
+    add_cache_tags(
+        request,
+        category_feed_tag(category.id),
+        object_tag(category)
     )
+    add_post_cache_tags(request, page_obj)
+    set_validators(request, page_obj, (category_feed_tag(category.id),))
 
     return render(
         request,
         'blog/category.html',
         {
             'category': category,
-            'page_obj': get_paginator(
-                category.posts.filter(
-                    pub_date__lte=timezone.now(),
-                    is_published=True
-                ),
-                request.GET.get('page')
-            )
+            'page_obj': page_obj
         }
     )
 
 
+@cache_page_for_anonymous
+@conditional_page(profile_validators)
 def user_profile(request, username):
-    """Профиль пользователя."""
+    """
+    Профиль пользователя.
+
+    Владелец видит все свои посты, остальные — только опубликованные.
+    Путь посетителя не зависит от того, кто смотрит, и обслуживается
+    частичным индексом post_author_visible_feed_idx.
+    """
     profile = get_object_or_404(
         User,
         username=username
     )
-    posts = profile.posts.filter(
-        Q(author_id=request.user.id)
-        | Q(pub_date__lte=timezone.now())
-        & Q(is_published=True,)
-    ).annotate(
-        comment_count=Count(
-            'comments'
-        )
-    ).order_by(
-        '-pub_date'
+    owner = request.user.id == profile.id
+    posts = profile.posts.all() if owner else profile.posts.published()
+    page_obj = get_paginator(
+        posts.for_feed(),
+        request.GET,
+        count_key=profile_count_key(profile.id, owner=owner)
     )
+    registry.attach(page_obj)
+    add_cache_tags(request, profile_feed_tag(profile.id), object_tag(profile))
+    add_post_cache_tags(request, page_obj)
+    set_validators(request, page_obj, (profile_feed_tag(profile.id),))
 
     return render(
         request,
         'blog/profile.html',
         {
             'profile': profile,
-            'page_obj': get_paginator(
-                posts,
-                request.GET.get('page')
-            ),
+            'page_obj': page_obj,
+        }
+    )
+
+
+def search(request):
+    """Поиск по опубликованным постам."""
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        page_obj = get_cursor_page(
+            search_posts(Post.published_posts.for_feed(), query),
+            request.GET,
+            ordering=SEARCH_ORDERING
+        )
+        registry.attach(page_obj)
+    return render(
+        request,
+        'blog/search.html',
+        {
+            'query': query,
+            'page_obj': page_obj,
         }
     )
 
@@ -171,14 +277,8 @@ class PostUpdateView(UserTestCastomMixin, UpdateView):
     form_class = PostForm
     pk_url_kwarg = 'post_id'
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(
-            self.model,
-            pk=self.kwargs[
-                self.pk_url_kwarg
-            ],
-            is_published=True
-        )
+    def get_queryset(self):
+        return self.model.objects.filter(is_published=True)
 
     def get_success_url(self):
         return reverse_lazy(
@@ -196,14 +296,8 @@ class PostDeleteView(UserTestCastomMixin, DeleteView):
     model = Post
     pk_url_kwarg = 'post_id'
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(
-            self.model,
-            pk=self.kwargs[
-                self.pk_url_kwarg
-            ],
-            is_published=True
-        )
+    def get_queryset(self):
+        return self.model.objects.filter(is_published=True)
 
     def get_success_url(self):
         return reverse_lazy(
@@ -212,6 +306,7 @@ class PostDeleteView(UserTestCastomMixin, DeleteView):
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
     """Добавление комментария."""
     form = CommentForm(
@@ -244,22 +339,14 @@ class CommentUpdateView(UserTestCastomMixin, UpdateView):
     def handle_no_permission(self):
         return redirect(
             'blog:post_detail',
-            post_id=self.get_object().post.pk
-        )
-
-    def get_object(self, queryset=None):
-        return get_object_or_404(
-            self.model,
-            pk=self.kwargs[
-                self.pk_url_kwarg
-            ]
+            post_id=self.get_object().post_id
         )
 
     def get_success_url(self):
         return reverse_lazy(
             'blog:post_detail',
             kwargs={
-                'post_id': self.get_object().post.pk
+                'post_id': self.get_object().post_id
             }
         )
 
@@ -274,21 +361,13 @@ class CommentDeleteView(UserTestCastomMixin, DeleteView):
     def handle_no_permission(self):
         return redirect(
             'blog:post_detail',
-            post_id=self.get_object().post.pk
-        )
-
-    def get_object(self, queryset=None):
-        return get_object_or_404(
-            self.model,
-            pk=self.kwargs[
-                self.pk_url_kwarg
-            ]
+            post_id=self.get_object().post_id
         )
 
     def get_success_url(self):
         return reverse_lazy(
             'blog:post_detail',
             kwargs={
-                'post_id': self.get_object().post.pk
+                'post_id': self.get_object().post_id
             }
         )
@@ -1,3 +1,5 @@
+import os
+import tempfile
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -34,6 +36,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,7 +57,7 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.InstrumentedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -121,3 +124,87 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 LOGIN_URL = '/auth/login/'
 
 LOGIN_REDIRECT_URL = 'blog:index'
+
+# LocMem у каждого процесса свой: сбросы счётчиков, страниц и
+# карточек доходят только до процесса, который изменил данные, а
+# остальные отдают устаревшее до истечения сроков хранения. Поэтому
+# без общего кэша (BLOGICUM_MEMCACHED=host:port, нужен pymemcache)
+# сроки ниже сокращены до минуты.
+SHARED_CACHE = os.environ.get('BLOGICUM_MEMCACHED')
+
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.InstrumentedPyMemcacheCache',
+            'LOCATION': SHARED_CACHE,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.InstrumentedLocMemCache',
+        }
+    }
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.middleware': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
+SLOW_QUERY_THRESHOLD_MS = 100
+
+SLOW_QUERY_LOG = BASE_DIR / 'slow_queries.log'
+
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+
+SLOW_QUERY_LOG_BACKUPS = 5
+
+METRICS_DIR = os.environ.get(
+    'BLOGICUM_METRICS_DIR',
+    os.path.join(tempfile.gettempdir(), 'blogicum-metrics')
+)
+
+METRICS_ALLOWED_IPS = INTERNAL_IPS
+
+REGISTRY_VERSION_FILE = os.environ.get(
+    'BLOGICUM_REGISTRY_VERSION_FILE',
+    os.path.join(tempfile.gettempdir(), 'blogicum-registry.version')
+)
+
+REGISTRY_TTL = 60
+
+TEMPLATE_PROFILING = bool(os.environ.get('BLOGICUM_TEMPLATE_PROFILING'))
+
+FEED_COUNT_CACHE_TIMEOUT = 60 * 5 if SHARED_CACHE else 60
+
+PAGE_CACHE_TIMEOUT = 60
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60 if SHARED_CACHE else 60
+
+FEED_COUNT_ESTIMATE_LIMIT = None
+
+FEED_NUMBERED_PAGES = True
+
+POST_IMAGE_VARIANTS = {
+    'card': 640,
+    'detail': 960,
+    'retina': 1280,
+}
+
+POST_IMAGE_QUALITY = 85
+
+POST_IMAGE_WORKERS = 2
+
+# Через сколько секунд без копий изображение считается брошенным.
+POST_IMAGE_SWEEP_DELAY = 60 * 10
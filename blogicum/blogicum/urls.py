@@ -5,6 +5,8 @@ from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 from django.urls import path, include, reverse_lazy
 
+from core.views import metrics, template_profile
+
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.page_error'
 
@@ -32,6 +34,10 @@ urlpatterns = [
     path('auth/', include(auth_pathes)),
     path('pages/', include('pages.urls', namespace='pages')),
     path('admin/', admin.site.urls),
+    path('metrics/', metrics, name='metrics'),
+    path(
+        'metrics/templates/', template_profile, name='template_profile'
+    ),
     path('', include('blog.urls', namespace='blog')),
 ]
 
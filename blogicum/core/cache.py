@@ -0,0 +1,46 @@
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import PyMemcacheCache
+
+from .instrumentation import record_cache
+
+_missing = object()
+
+
+class InstrumentedCacheMixin:
+    """
+    Считает попадания и промахи кэша в метриках текущего запроса.
+
+    get_or_set и остальные чтения BaseCache идут через get. get_many
+    у memcached читает все ключи одним get_multi, минуя get, поэтому
+    он переопределён и учитывает попадание или промах по каждому ключу.
+    """
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _missing, version=version)
+        record_cache(value is not _missing)
+        return default if value is _missing else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = self._get_many(keys, version)
+        for key in keys:
+            record_cache(key in values)
+        return values
+
+    def _get_many(self, keys, version):
+        return super().get_many(keys, version=version)
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    def _get_many(self, keys, version):
+        # BaseCache.get_many читает через get и посчитал бы ключи дважды.
+        values = {}
+        for key in keys:
+            value = LocMemCache.get(self, key, _missing, version=version)
+            if value is not _missing:
+                values[key] = value
+        return values
+
+
+class InstrumentedPyMemcacheCache(InstrumentedCacheMixin, PyMemcacheCache):
+    pass
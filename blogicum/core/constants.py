@@ -3,3 +3,10 @@ OFFSET = 0
 LIMIT = 5
 SLICE = 25
 PAGINATE_LIMIT = 10
+COMMENTS_PAGINATE_LIMIT = 20
+PAGES_ON_EACH_SIDE = 2
+PAGES_ON_ENDS = 1
+FEED_ORDERING = ('-pub_date', '-id')
+COMMENT_ORDERING = ('created_at', 'id')
+IMPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
@@ -0,0 +1,102 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from .slow_queries import record_slow_query
+
+_current = ContextVar('request_metrics', default=None)
+
+
+@dataclass
+class RequestMetrics:
+    """Затраты одного запроса: SQL, шаблоны и обращения к кэшу."""
+
+    sql_time: float = 0.0
+    sql_count: int = 0
+    template_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # Вложенные рендеры (render_to_string в теге) уже входят во внешний.
+    template_depth: int = 0
+    request: object = None
+    # Идёт EXPLAIN медленного запроса: его не нужно ни считать,
+    # ни проверять на медленность.
+    explaining: bool = False
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """
+        Обёртка для connection.execute_wrapper: время и число запросов.
+
+        Запросы дольше SLOW_QUERY_THRESHOLD_MS записываются в журнал
+        медленных запросов вместе с планом.
+        """
+        if self.explaining:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.sql_time += duration
+            self.sql_count += 1
+            threshold = settings.SLOW_QUERY_THRESHOLD_MS
+            if threshold is not None and duration * 1000 >= threshold:
+                self.explaining = True
+                try:
+                    record_slow_query(
+                        context['connection'], sql, params, many, duration,
+                        view_name(self.request)
+                    )
+                finally:
+                    self.explaining = False
+
+
+def view_name(request):
+    """Имя представления, например 'blog:index', или '-' без маршрута."""
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else '-'
+
+
+def current_metrics():
+    """Метрики текущего запроса или None вне ServerTimingMiddleware."""
+    return _current.get()
+
+
+def start_request(request):
+    """Начинает сбор метрик; результат передаётся в finish_request."""
+    metrics = RequestMetrics(request=request)
+    return metrics, _current.set(metrics)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+def record_cache(hit):
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+@contextmanager
+def template_timer():
+    """Время рендера шаблона верхнего уровня."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    metrics.template_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.template_depth -= 1
+        if not metrics.template_depth:
+            metrics.template_time += time.perf_counter() - started
@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from core.template_profiler import SORT_KEYS, profiler
+
+
+class Command(BaseCommand):
+    help = (
+        'Профиль рендера шаблонов: время каждого шаблона, include и '
+        'тега по серии запросов к страницам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            default=['/'],
+            help='Адреса страниц.'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=10,
+            help='Сколько раз запросить каждую страницу.'
+        )
+        parser.add_argument(
+            '--user',
+            help='Имя пользователя, от которого выполняются запросы.'
+        )
+        parser.add_argument(
+            '--sort',
+            choices=SORT_KEYS,
+            default='self',
+            help='Сортировка: по собственному, общему времени или числу.'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=30,
+            help='Сколько строк вывести.'
+        )
+        parser.add_argument(
+            '--stacks',
+            help='Файл для свёрнутых стеков (flamegraph.pl, speedscope).'
+        )
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST='localhost')
+        if options['user']:
+            user = get_user_model().objects.filter(
+                username=options['user']
+            ).first()
+            if user is None:
+                raise CommandError(
+                    f'Пользователь {options["user"]} не найден.'
+                )
+            client.force_login(user)
+        profiler.enable()
+        profiler.reset()
+        for path in options['paths']:
+            for _ in range(options['requests']):
+                response = client.get(path)
+                if response.status_code != 200:
+                    raise CommandError(
+                        f'{path}: код ответа {response.status_code}.'
+                    )
+        self.stdout.write(
+            profiler.report(options['sort'], options['limit']), ending=''
+        )
+        if options['stacks']:
+            with open(options['stacks'], 'w', encoding='utf-8') as file:
+                file.write(profiler.collapsed_stacks())
+            self.stdout.write(
+                self.style.SUCCESS(f'Стеки записаны в {options["stacks"]}.')
+            )
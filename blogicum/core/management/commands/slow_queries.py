@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.slow_queries import read_entries
+
+ORDERINGS = {
+    'total': lambda stats: stats['total_ms'],
+    'max': lambda stats: stats['max_ms'],
+    'count': lambda stats: stats['count'],
+}
+SQL_PREVIEW_LENGTH = 300
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка журнала медленных запросов: самые затратные запросы, '
+        'сгруппированные по отпечатку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log',
+            default=str(settings.SLOW_QUERY_LOG),
+            help='Файл журнала; ротированные копии читаются тоже.'
+        )
+        parser.add_argument(
+            '--order',
+            choices=tuple(ORDERINGS),
+            default='total',
+            help='Сортировка: по суммарному, худшему времени или числу.'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Сколько запросов вывести.'
+        )
+
+    def handle(self, *args, **options):
+        groups = {}
+        for entry in read_entries(options['log']):
+            stats = groups.setdefault(entry['fingerprint'], {
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'views': set(),
+                'sql': entry['sql'],
+                'plan': None,
+            })
+            stats['count'] += 1
+            stats['total_ms'] += entry['duration_ms']
+            stats['max_ms'] = max(stats['max_ms'], entry['duration_ms'])
+            stats['views'].add(entry['view'])
+            stats['plan'] = entry.get('plan') or stats['plan']
+        if not groups:
+            self.stdout.write('Медленных запросов нет.')
+            return
+        worst = sorted(
+            groups.items(), key=lambda item: ORDERINGS[options['order']](
+                item[1]
+            ), reverse=True
+        )[:options['limit']]
+        for fingerprint, stats in worst:
+            self.stdout.write(self.style.WARNING(
+                f'{fingerprint}: {stats["count"]} раз, '
+                f'всего {stats["total_ms"]:.1f} мс, '
+                f'в среднем {stats["total_ms"] / stats["count"]:.1f} мс, '
+                f'максимум {stats["max_ms"]:.1f} мс'
+            ))
+            self.stdout.write(
+                f'  представления: {", ".join(sorted(stats["views"]))}'
+            )
+            self.stdout.write(f'  {stats["sql"][:SQL_PREVIEW_LENGTH]}')
+            for step in stats['plan'] or ():
+                self.stdout.write(f'    {step}')
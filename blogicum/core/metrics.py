@@ -0,0 +1,338 @@
+import glob
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+HEADER = struct.Struct('i4x')
+KEY_LENGTH = struct.Struct('i')
+VALUE = struct.Struct('d')
+INITIAL_SIZE = 64 * 1024
+FILE_SUFFIX = '.metrics'
+MERGED_NAME = f'merged{FILE_SUFFIX}'
+LOCK_NAME = 'merge.lock'
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, math.inf
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, math.inf)
+
+# Имя: (тип, описание). Гистограммы хранятся как _bucket, _sum, _count.
+FAMILIES = {
+    'blogicum_requests_total': (
+        'counter', 'Запросы по представлениям и кодам ответа.'
+    ),
+    'blogicum_request_duration_seconds': (
+        'histogram', 'Время ответа представления.'
+    ),
+    'blogicum_request_sql_queries': (
+        'histogram', 'Число SQL-запросов на запрос.'
+    ),
+    'blogicum_request_sql_duration_seconds': (
+        'histogram', 'Суммарное время SQL-запросов на запрос.'
+    ),
+    'blogicum_cache_requests_total': (
+        'counter', 'Чтения кэша: попадания (hit) и промахи (miss).'
+    ),
+    'blogicum_cache_hit_ratio': (
+        'gauge', 'Доля попаданий в кэш за всё время.'
+    ),
+    'blogicum_writes_total': (
+        'counter', 'Создание, изменение и удаление постов и комментариев.'
+    ),
+}
+
+
+class MmapStore:
+    """
+    Значения метрик одного процесса в файле, отображённом в память.
+
+    Формат: заголовок с длиной занятой части, затем записи
+    «длина ключа, ключ, выравнивание до 8 байт, double». Пишет
+    только процесс-владелец, поэтому межпроцессные блокировки не
+    нужны: новая запись сначала целиком записывается, а потом
+    увеличивается длина в заголовке, и читатель видит либо старое,
+    либо новое состояние.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a+b')
+        if not os.fstat(self._file.fileno()).st_size:
+            self._file.truncate(INITIAL_SIZE)
+        self._map()
+        self._positions = {
+            key: position for key, _, position in iter_entries(self._mmap)
+        }
+        self._used = HEADER.unpack_from(self._mmap)[0] or HEADER.size
+
+    def _map(self):
+        self._capacity = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), self._capacity)
+
+    def _append(self, key):
+        encoded = key.encode()
+        padding = -(KEY_LENGTH.size + len(encoded)) % VALUE.size
+        entry = KEY_LENGTH.pack(len(encoded)) + encoded + b'\0' * padding
+        size = len(entry) + VALUE.size
+        while self._used + size > self._capacity:
+            self._mmap.close()
+            self._file.truncate(self._capacity * 2)
+            self._map()
+        position = self._used + len(entry)
+        self._mmap[self._used:position] = entry
+        VALUE.pack_into(self._mmap, position, 0.0)
+        self._used += size
+        HEADER.pack_into(self._mmap, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def inc(self, key, amount=1.0):
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._append(key)
+            value = VALUE.unpack_from(self._mmap, position)[0]
+            VALUE.pack_into(self._mmap, position, value + amount)
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+def iter_entries(data):
+    """(ключ, значение, позиция значения) записей файла метрик."""
+    used = HEADER.unpack_from(data)[0]
+    position = HEADER.size
+    while position < used:
+        length = KEY_LENGTH.unpack_from(data, position)[0]
+        start = position + KEY_LENGTH.size
+        key = bytes(data[start:start + length]).decode()
+        position = start + length + (
+            -(KEY_LENGTH.size + length) % VALUE.size
+        )
+        yield key, VALUE.unpack_from(data, position)[0], position
+        position += VALUE.size
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Хранилище текущего процесса в METRICS_DIR.
+
+    У каждого процесса свой файл <pid>.metrics; после fork процесс
+    заводит новый. Файлы завершившихся процессов сливает
+    merge_dead_stores.
+    """
+    global _store
+    path = os.path.join(
+        settings.METRICS_DIR, f'{os.getpid()}{FILE_SUFFIX}'
+    )
+    store = _store
+    if store is None or store.path != path:
+        with _store_lock:
+            if _store is None or _store.path != path:
+                os.makedirs(settings.METRICS_DIR, exist_ok=True)
+                _store = MmapStore(path)
+            store = _store
+    return store
+
+
+def metric_key(name, **labels):
+    return json.dumps([name, sorted(labels.items())], ensure_ascii=False)
+
+
+def inc(name, amount=1, **labels):
+    get_store().inc(metric_key(name, **labels), amount)
+
+
+def observe(name, value, buckets, **labels):
+    """Наблюдение гистограммы: накопленные корзины, сумма и число."""
+    store = get_store()
+    for bound in buckets:
+        if value <= bound:
+            store.inc(metric_key(f'{name}_bucket', le=bound, **labels))
+    store.inc(metric_key(f'{name}_sum', **labels), value)
+    store.inc(metric_key(f'{name}_count', **labels))
+
+
+def observe_request(view, method, status, duration, request_metrics):
+    """Метрики одного запроса, собранные ServerTimingMiddleware."""
+    inc('blogicum_requests_total', view=view, method=method, status=status)
+    observe(
+        'blogicum_request_duration_seconds', duration, LATENCY_BUCKETS,
+        view=view
+    )
+    observe(
+        'blogicum_request_sql_queries', request_metrics.sql_count,
+        QUERY_COUNT_BUCKETS, view=view
+    )
+    observe(
+        'blogicum_request_sql_duration_seconds', request_metrics.sql_time,
+        LATENCY_BUCKETS, view=view
+    )
+    for result, count in (
+        ('hit', request_metrics.cache_hits),
+        ('miss', request_metrics.cache_misses),
+    ):
+        if count:
+            inc('blogicum_cache_requests_total', count, result=result)
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def dead_stores(directory):
+    """Файлы <pid>.metrics завершившихся процессов."""
+    for path in glob.glob(os.path.join(directory, f'*{FILE_SUFFIX}')):
+        name = os.path.basename(path)[:-len(FILE_SUFFIX)]
+        if name.isdigit() and not is_alive(int(name)):
+            yield path
+
+
+def merge_store(merged, path):
+    try:
+        with open(path, 'rb') as file:
+            data = file.read()
+    except FileNotFoundError:
+        # Уже слит другим процессом.
+        return
+    if len(data) >= HEADER.size:
+        for key, value, _ in iter_entries(data):
+            merged.inc(key, value)
+    os.remove(path)
+
+
+def merge_dead_stores():
+    """
+    Переносит значения завершившихся процессов в merged.metrics.
+
+    Счётчики не уменьшаются, а число файлов, которые читает каждый
+    сбор, не растёт со временем. Слияния разных процессов
+    разделяются блокировкой merge.lock. Без fcntl (Windows) файлы
+    не сливаются.
+    """
+    if fcntl is None:
+        return
+    directory = settings.METRICS_DIR
+    dead = list(dead_stores(directory))
+    if not dead:
+        return
+    with open(os.path.join(directory, LOCK_NAME), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        merged = MmapStore(os.path.join(directory, MERGED_NAME))
+        try:
+            for path in dead:
+                merge_store(merged, path)
+        finally:
+            merged.close()
+
+
+def collect():
+    """Сумма значений по файлам всех процессов."""
+    merge_dead_stores()
+    totals = {}
+    for path in glob.glob(os.path.join(
+        settings.METRICS_DIR, f'*{FILE_SUFFIX}'
+    )):
+        with open(path, 'rb') as file:
+            data = file.read()
+        if len(data) < HEADER.size:
+            continue
+        for key, value, _ in iter_entries(data):
+            totals[key] = totals.get(key, 0.0) + value
+    return totals
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    # Как принято в Prometheus, le идёт последней.
+    for name, value in sorted(labels, key=lambda label: label[0] == 'le'):
+        if not isinstance(value, str):
+            value = format_value(value)
+        value = value.replace(
+            '\\', '\\\\'
+        ).replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def family_name(name):
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and name[:-len(suffix)] in FAMILIES:
+            return name[:-len(suffix)]
+    return name
+
+
+def render():
+    """Все метрики в текстовом формате Prometheus."""
+    totals = collect()
+    hits = misses = 0.0
+    samples = {}
+    for key, value in totals.items():
+        name, labels = json.loads(key)
+        if name == 'blogicum_cache_requests_total':
+            if dict(labels)['result'] == 'hit':
+                hits += value
+            else:
+                misses += value
+        samples.setdefault(family_name(name), []).append(
+            (name, labels, value)
+        )
+    if hits + misses:
+        samples['blogicum_cache_hit_ratio'] = [
+            ('blogicum_cache_hit_ratio', [], hits / (hits + misses))
+        ]
+    lines = []
+    for family in sorted(samples):
+        kind, description = FAMILIES.get(family, ('untyped', ''))
+        lines.append(f'# HELP {family} {description}')
+        lines.append(f'# TYPE {family} {kind}')
+        for name, labels, value in sorted(
+            samples[family], key=sample_order
+        ):
+            lines.append(
+                f'{name}{format_labels(labels)} {format_value(value)}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def sample_order(sample):
+    """Порядок строк: корзины гистограммы по возрастанию le."""
+    name, labels, _ = sample
+    le = dict(labels).get('le', 0)
+    return (
+        name,
+        [(key, value) for key, value in labels if key != 'le'],
+        le,
+    )
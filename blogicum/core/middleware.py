@@ -0,0 +1,66 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .instrumentation import finish_request, start_request, view_name
+from .metrics import observe_request
+
+logger = logging.getLogger(__name__)
+
+
+class ServerTimingMiddleware:
+    """
+    Замеры запроса в заголовке Server-Timing и строке лога.
+
+    Общее время, время и число SQL-запросов (через
+    connection.execute_wrapper), время рендера шаблонов
+    (InstrumentedDjangoTemplates) и попадания в кэш
+    (InstrumentedLocMemCache). Медленные запросы попадают в журнал
+    core.slow_queries, счётчики и гистограммы — в core.metrics.
+    Должен стоять первым в MIDDLEWARE,
+    чтобы общее время включало остальные middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics, token = start_request(request)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.execute_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            finish_request(token)
+        total = time.perf_counter() - started
+        response['Server-Timing'] = ', '.join((
+            f'total;dur={total * 1000:.1f}',
+            f'sql;dur={metrics.sql_time * 1000:.1f};'
+            f'desc="{metrics.sql_count} queries"',
+            f'tpl;dur={metrics.template_time * 1000:.1f}',
+            f'cache;desc="hit={metrics.cache_hits} '
+            f'miss={metrics.cache_misses}"',
+        ))
+        view = view_name(request)
+        logger.info(
+            'view=%s method=%s status=%s total_ms=%.1f sql_ms=%.1f '
+            'sql_count=%d template_ms=%.1f cache_hits=%d cache_misses=%d',
+            view, request.method, response.status_code,
+            total * 1000, metrics.sql_time * 1000, metrics.sql_count,
+            metrics.template_time * 1000, metrics.cache_hits,
+            metrics.cache_misses,
+            extra={'view_name': view, 'metrics': metrics},
+        )
+        try:
+            observe_request(
+                view, request.method, response.status_code, total, metrics
+            )
+        except OSError:
+            logger.exception('Не удалось записать метрики запроса')
+        return response
@@ -0,0 +1,318 @@
+import base64
+import binascii
+import datetime
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Page, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+NEXT = 'n'
+PREVIOUS = 'p'
+# Последняя страница: обратный порядок сортировки без ключа.
+LAST = 'l'
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Сохраняет микросекунды, без них ключ сортировки неоднозначен."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class CursorPaginator:
+    """
+    Keyset-пагинатор.
+
+    Страницы строятся не через OFFSET, а через условие на ключ
+    сортировки последней показанной записи, поэтому стоимость запроса
+    не зависит от глубины страницы. Последнее поле сортировки должно
+    быть уникальным (обычно 'id' или '-id').
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.ordering = tuple(ordering)
+        self.queryset = queryset.order_by(*self.ordering)
+        self.per_page = int(per_page)
+
+    @property
+    def fields(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def encode_cursor(self, obj, direction=NEXT):
+        """Возвращает непрозрачный токен позиции после/перед объектом."""
+        values = [getattr(obj, field) for field in self.fields]
+        return self._encode(direction, values)
+
+    def encode_last_cursor(self):
+        """Токен последней страницы, без OFFSET и подсчёта строк."""
+        return self._encode(LAST, [])
+
+    def _encode(self, direction, values):
+        payload = json.dumps(
+            {'d': direction, 'v': values},
+            cls=CursorEncoder,
+            separators=(',', ':')
+        )
+        return base64.urlsafe_b64encode(
+            payload.encode()
+        ).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """
+        Разбирает токен.
+
+        Возвращаемое значение:
+            (direction, values) или None, если токен пуст или испорчен.
+        """
+        if not cursor:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)
+            ))
+            direction, raw_values = payload['d'], payload['v']
+            if direction == LAST and raw_values == []:
+                return direction, []
+            if direction not in (NEXT, PREVIOUS):
+                return None
+            if len(raw_values) != len(self.fields):
+                return None
+            values = [
+                self._to_python(field, value)
+                for field, value in zip(self.fields, raw_values)
+            ]
+        except (
+            binascii.Error, ValueError, TypeError, KeyError, ValidationError
+        ):
+            return None
+        if any(value is None for value in values):
+            return None
+        return direction, values
+
+    def _to_python(self, field, value):
+        try:
+            model_field = self.queryset.model._meta.get_field(field)
+        except FieldDoesNotExist:
+            return value
+        return model_field.to_python(value)
+
+    def _seek(self, values, forward):
+        """
+        Условие «строго после ключа» в порядке сортировки.
+
+        Первое поле вынесено отдельным неравенством, чтобы SQLite мог
+        использовать индекс для поиска по диапазону.
+        """
+        lookups = []
+        for field in self.ordering:
+            descending = field.startswith('-')
+            if descending == forward:
+                lookups.append('lt')
+            else:
+                lookups.append('gt')
+        condition = Q()
+        equal = {}
+        for field, lookup, value in zip(self.fields, lookups, values):
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        first_field, first_lookup = self.fields[0], lookups[0]
+        return Q(**{f'{first_field}__{first_lookup}e': values[0]}) & condition
+
+    def _reversed_ordering(self):
+        return [
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        ]
+
+    def get_page(self, cursor=None):
+        """Возвращает страницу для токена; испорченный токен — первая."""
+        position = self.decode_cursor(cursor)
+        if position is None:
+            rows = list(self.queryset[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            return CursorPage(rows[:self.per_page], self, has_more, False)
+
+        direction, values = position
+        queryset = self.queryset
+        if direction != LAST:
+            queryset = queryset.filter(self._seek(values, direction == NEXT))
+        if direction != NEXT:
+            queryset = queryset.order_by(*self._reversed_ordering())
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == NEXT:
+            return CursorPage(rows, self, has_more, True)
+        rows.reverse()
+        return CursorPage(rows, self, direction == PREVIOUS, has_more)
+
+
+class CursorPage(Sequence):
+    """Страница keyset-пагинатора."""
+
+    number = None
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next and bool(object_list)
+        self._has_previous = has_previous and bool(object_list)
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], NEXT)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], PREVIOUS)
+
+    @property
+    def last_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_last_cursor()
+
+
+class FeedPage(Page):
+    """
+    Нумерованная страница ленты.
+
+    Помимо номеров отдаёт курсоры соседних и последней страниц, чтобы
+    переходы «вперёд/назад» и на последнюю страницу шли через
+    keyset-пагинацию, а не через OFFSET.
+    """
+
+    # Есть ли записи дальше страницы, когда число страниц неточно.
+    has_more = None
+
+    def has_next(self):
+        if self.has_more is not None:
+            return self.has_more
+        return super().has_next()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.cursor_paginator.encode_cursor(
+            self[-1], NEXT
+        )
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.cursor_paginator.encode_cursor(
+            self[0], PREVIOUS
+        )
+
+    @property
+    def last_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.cursor_paginator.encode_last_cursor()
+
+
+class FeedPaginator(Paginator):
+    """
+    Пагинатор по номеру страницы, совместимый с курсорами.
+
+    Если передан count_key, число объектов берётся из кэша и
+    пересчитывается только после сброса ключа или истечения
+    FEED_COUNT_CACHE_TIMEOUT. При FEED_COUNT_ESTIMATE_LIMIT строки
+    считаются не дальше этого лимита: для огромных лент точное число
+    страниц не нужно, а остальное доступно через курсоры. Если счётчик
+    упёрся в лимит, число страниц — только нижняя граница: последние
+    номера страниц не выводятся, а следующая страница определяется
+    по лишней записи, как у CursorPaginator.
+    """
+
+    def __init__(self, queryset, per_page, ordering, count_key=None,
+                 **kwargs):
+        self.cursor_paginator = CursorPaginator(queryset, per_page, ordering)
+        self.count_key = count_key
+        super().__init__(self.cursor_paginator.queryset, per_page, **kwargs)
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return self._count_objects()
+        count = cache.get(self.count_key)
+        if count is None:
+            count = self._count_objects()
+            cache.set(
+                self.count_key, count, settings.FEED_COUNT_CACHE_TIMEOUT
+            )
+        return count
+
+    @property
+    def count_is_capped(self):
+        """Упёрся ли подсчёт в FEED_COUNT_ESTIMATE_LIMIT."""
+        limit = settings.FEED_COUNT_ESTIMATE_LIMIT
+        return bool(limit) and self.count >= limit
+
+    def page(self, number):
+        if not self.count_is_capped:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        page = self._get_page(rows[:self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+    def get_elided_page_range(self, number=1, *, on_each_side=3,
+                              on_ends=2):
+        pages = super().get_elided_page_range(
+            number, on_each_side=on_each_side, on_ends=on_ends
+        )
+        if not self.count_is_capped:
+            return pages
+        number = self.validate_number(number)
+        window = []
+        for page in pages:
+            if page != self.ELLIPSIS and page > number + on_each_side:
+                break
+            window.append(page)
+        if window[-1] != self.ELLIPSIS:
+            window.append(self.ELLIPSIS)
+        return window
+
+    def _count_objects(self):
+        limit = settings.FEED_COUNT_ESTIMATE_LIMIT
+        if limit:
+            return self.object_list[:limit].count()
+        return Paginator.count.func(self)
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
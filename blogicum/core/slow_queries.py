@@ -0,0 +1,130 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER = re.compile(r'%s')
+IN_LIST = re.compile(r'IN \((?:\?, )*\?\)')
+WHITESPACE = re.compile(r'\s+')
+
+_handler = None
+
+
+def normalize_sql(sql):
+    """
+    SQL без конкретных значений.
+
+    Литералы, числа и параметры заменяются на ?, списки IN
+    сворачиваются: запросы, различающиеся только значениями,
+    совпадают.
+    """
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER.sub('?', sql)
+    sql = PLACEHOLDER.sub('?', sql)
+    sql = IN_LIST.sub('IN (...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.md5(normalized_sql.encode()).hexdigest()[:12]
+
+
+def params_shape(params, many):
+    """Типы параметров без значений: ['int', 'str'] или число наборов."""
+    if params is None:
+        return []
+    if many:
+        return {'sets': len(params) if hasattr(params, '__len__') else None}
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+
+def explain(connection, sql, params, many):
+    """
+    План запроса SQLite (EXPLAIN QUERY PLAN) или None.
+
+    План строится только для одиночных SELECT: для остальных
+    запросов и других СУБД он не нужен или недоступен.
+    """
+    if (
+        connection.vendor != 'sqlite'
+        or many
+        or not sql.lstrip().upper().startswith('SELECT')
+    ):
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+    except DatabaseError:
+        return None
+
+
+def get_handler():
+    """
+    Обработчик с ротацией файла SLOW_QUERY_LOG.
+
+    Пересоздаётся при смене пути в настройках. RotatingFileHandler
+    не согласует ротацию между процессами: при нескольких процессах
+    у каждого должен быть свой файл или внешняя ротация.
+    """
+    global _handler
+    path = os.path.abspath(settings.SLOW_QUERY_LOG)
+    if _handler is None or _handler.baseFilename != path:
+        if _handler is not None:
+            _handler.close()
+        _handler = RotatingFileHandler(
+            path,
+            maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+            backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+            encoding='utf-8',
+            delay=True,
+        )
+    return _handler
+
+
+def record_slow_query(connection, sql, params, many, duration, view):
+    """Записывает медленный запрос строкой JSON в SLOW_QUERY_LOG."""
+    normalized = normalize_sql(sql)
+    entry = {
+        'time': timezone.now().isoformat(),
+        'fingerprint': fingerprint(normalized),
+        'duration_ms': round(duration * 1000, 3),
+        'view': view,
+        'sql': normalized,
+        'params': params_shape(params, many),
+        'plan': explain(connection, sql, params, many),
+    }
+    get_handler().handle(logging.makeLogRecord({
+        'msg': json.dumps(entry, ensure_ascii=False),
+    }))
+    return entry
+
+
+def read_entries(path):
+    """Записи лога и его ротированных копий (path.1, path.2, ...)."""
+    paths = [path]
+    number = 1
+    while os.path.exists(f'{path}.{number}'):
+        paths.append(f'{path}.{number}')
+        number += 1
+    for file_path in reversed(paths):
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
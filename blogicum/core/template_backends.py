@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+from .instrumentation import template_timer
+from .template_profiler import profiler
+
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        with template_timer():
+            return super().render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    Шаблоны Django с замером времени рендера для Server-Timing.
+
+    При включённом профилировщике (TEMPLATE_PROFILING или
+    profiler.enable()) загружаемые шаблоны, включая include и
+    extends, получают замеры каждого тега.
+    """
+
+    def __init__(self, params):
+        super().__init__(params)
+        find_template = self.engine.find_template
+
+        def find_profiled_template(*args, **kwargs):
+            template, origin = find_template(*args, **kwargs)
+            if profiler.enabled:
+                profiler.instrument(template)
+            return template, origin
+
+        self.engine.find_template = find_profiled_template
+        if settings.TEMPLATE_PROFILING:
+            profiler.enabled = True
+
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return TimedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
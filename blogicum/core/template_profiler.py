@@ -0,0 +1,167 @@
+import threading
+import time
+from contextvars import ContextVar
+
+from django.template import engines
+from django.template.base import TextNode, VariableNode
+
+SORT_KEYS = ('self', 'total', 'count')
+# Теги, у которых в подписи нужен первый аргумент.
+NAMED_TAGS = ('include', 'block', 'extends')
+
+_frames = ContextVar('template_frames', default=None)
+
+
+class Frame:
+    __slots__ = ('label', 'children')
+
+    def __init__(self, label):
+        self.label = label
+        self.children = 0.0
+
+
+def node_label(node):
+    """Подпись узла: 'include "includes/post_card.html"' или 'tag url'."""
+    parts = node.token.contents.split()
+    if parts[0] in NAMED_TAGS:
+        return ' '.join(parts[:2])
+    return f'tag {parts[0]}'
+
+
+class TemplateProfiler:
+    """
+    Профиль рендера шаблонов, тегов и include, накопленный по запросам.
+
+    Для каждой подписи (шаблон, include или тег) считаются число
+    вызовов, общее время (без повторного учёта при рекурсии) и
+    собственное время без вложенных узлов. Собственное время по
+    полным стекам вызовов выгружается в формате свёрнутых стеков
+    для flamegraph.pl и speedscope.
+
+    Шаблоны инструментируются при загрузке, только пока профилирование
+    включено, поэтому в обычном режиме накладных расходов нет.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.totals = {}
+            self.stacks = {}
+
+    def enable(self):
+        """
+        Включает профилирование.
+
+        Кэширующие загрузчики сбрасываются, чтобы уже загруженные
+        шаблоны загрузились заново с замерами.
+        """
+        self.enabled = True
+        self._reset_loaders()
+
+    def disable(self):
+        """
+        Выключает профилирование.
+
+        Кэширующие загрузчики сбрасываются, чтобы шаблоны с замерами
+        загрузились заново без них.
+        """
+        self.enabled = False
+        self._reset_loaders()
+
+    def _reset_loaders(self):
+        for engine in engines.all():
+            for loader in getattr(engine, 'engine', engine).template_loaders:
+                if hasattr(loader, 'reset'):
+                    loader.reset()
+
+    def instrument(self, template):
+        """
+        Добавляет замеры шаблону и всем его тегам.
+
+        Кэшированный шаблон общий для потоков, поэтому проверка и
+        обёртка идут под блокировкой: иначе два потока обернули бы
+        его дважды и каждый вызов считался бы два раза.
+        """
+        with self._lock:
+            if getattr(template, '_profiled', False):
+                return template
+            template._render = self.timed(
+                template._render, f'template {template.name}'
+            )
+            for node in template.nodelist.get_nodes_by_type(object):
+                if isinstance(node, (TextNode, VariableNode)):
+                    continue
+                if getattr(node, 'token', None) is None:
+                    continue
+                node.render = self.timed(node.render, node_label(node))
+            template._profiled = True
+        return template
+
+    def timed(self, render, label):
+        def wrapper(context):
+            frames = _frames.get()
+            if frames is None:
+                frames = []
+                _frames.set(frames)
+            frame = Frame(label)
+            frames.append(frame)
+            started = time.perf_counter()
+            try:
+                return render(context)
+            finally:
+                elapsed = time.perf_counter() - started
+                frames.pop()
+                if frames:
+                    frames[-1].children += elapsed
+                self.record(
+                    [item.label for item in frames], frame, elapsed
+                )
+
+        return wrapper
+
+    def record(self, parents, frame, elapsed):
+        own = elapsed - frame.children
+        stack = ';'.join((*parents, frame.label))
+        with self._lock:
+            count, total, self_time = self.totals.get(
+                frame.label, (0, 0.0, 0.0)
+            )
+            if frame.label in parents:
+                # Рекурсивный вызов уже входит во внешний.
+                elapsed = 0.0
+            self.totals[frame.label] = (
+                count + 1, total + elapsed, self_time + own
+            )
+            self.stacks[stack] = self.stacks.get(stack, 0.0) + own
+
+    def report(self, sort='self', limit=None):
+        """Таблица подписей, отсортированная по sort."""
+        index = {'count': 0, 'total': 1, 'self': 2}[sort]
+        rows = sorted(
+            self.totals.items(), key=lambda item: item[1][index],
+            reverse=True
+        )[:limit]
+        lines = [
+            f'{"вызовов":>8} {"всего, мс":>10} {"своё, мс":>10} '
+            f'{"среднее, мс":>12}  шаблон или тег'
+        ]
+        for label, (count, total, self_time) in rows:
+            lines.append(
+                f'{count:>8} {total * 1000:>10.2f} {self_time * 1000:>10.2f}'
+                f' {total * 1000 / count:>12.3f}  {label}'
+            )
+        return '\n'.join(lines) + '\n'
+
+    def collapsed_stacks(self):
+        """Свёрнутые стеки: 'a;b;c <микросекунды>' на строку."""
+        return ''.join(
+            f'{stack} {round(own * 1_000_000)}\n'
+            for stack, own in sorted(self.stacks.items())
+        )
+
+
+profiler = TemplateProfiler()
@@ -1,10 +1,32 @@
-from django.core.paginator import Paginator
+from django.conf import settings
 
-from .constants import PAGINATE_LIMIT
+from .constants import FEED_ORDERING, PAGINATE_LIMIT
+from .paginators import CursorPaginator, FeedPaginator
 
 
-def get_paginator(queryset, page_number):
-    """Функция создания пагинатора."""
-    paginator = Paginator(queryset, PAGINATE_LIMIT)
-    page_obj = paginator.get_page(page_number)
+def get_cursor_page(queryset, params, ordering=FEED_ORDERING,
+                    per_page=PAGINATE_LIMIT):
+    """Страница keyset-пагинации по курсору из параметра 'cursor'."""
+    return CursorPaginator(
+        queryset, per_page, ordering
+    ).get_page(params.get('cursor'))
+
+
+def get_paginator(queryset, params, ordering=FEED_ORDERING, count_key=None):
+    """
+    Функция создания пагинатора.
+
+    Если в параметрах запроса есть курсор, страница строится
+    keyset-пагинацией без OFFSET и подсчёта строк,
+    иначе — по номеру страницы из параметра 'page'.
+    При FEED_NUMBERED_PAGES = False номера страниц не используются
+    вовсе: навигация только «вперёд/назад» по курсорам, без COUNT.
+    count_key — ключ кэша для числа объектов ленты.
+    """
+    if params.get('cursor') or not settings.FEED_NUMBERED_PAGES:
+        return get_cursor_page(queryset, params, ordering)
+    paginator = FeedPaginator(
+        queryset, PAGINATE_LIMIT, ordering, count_key=count_key
+    )
+    page_obj = paginator.get_page(params.get('page'))
     return page_obj
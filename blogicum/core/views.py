@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from .metrics import render
+from .template_profiler import SORT_KEYS, profiler
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def check_allowed(request):
+    """Служебные адреса доступны только с METRICS_ALLOWED_IPS."""
+    allowed = settings.METRICS_ALLOWED_IPS
+    if allowed is not None and request.META.get('REMOTE_ADDR') not in allowed:
+        raise Http404
+
+
+def metrics(request):
+    """
+    Метрики всех процессов в текстовом формате Prometheus.
+
+    Доступны только с адресов METRICS_ALLOWED_IPS; для остальных
+    адрес выглядит несуществующим.
+    """
+    check_allowed(request)
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
+
+
+def template_profile(request):
+    """
+    Профиль шаблонов текущего процесса.
+
+    ?format=stacks отдаёт свёрнутые стеки для flamegraph, ?sort=
+    задаёт сортировку таблицы. При выключенном профилировании
+    адрес не существует.
+    """
+    check_allowed(request)
+    if not profiler.enabled:
+        raise Http404
+    if request.GET.get('format') == 'stacks':
+        content = profiler.collapsed_stacks()
+    else:
+        sort = request.GET.get('sort')
+        content = profiler.report(sort if sort in SORT_KEYS else 'self')
+    return HttpResponse(content, content_type='text/plain; charset=utf-8')
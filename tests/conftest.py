@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,18 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def shared_state(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path / "metrics")
+    settings.REGISTRY_VERSION_FILE = str(tmp_path / "registry.version")
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
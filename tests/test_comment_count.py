@@ -0,0 +1,69 @@
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def comment_count(post):
+    return Post.objects.values_list(
+        "comment_count", flat=True
+    ).get(pk=post.pk)
+
+
+def test_add_comment_increases_count(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    for i in range(2):
+        user_client.post(
+            f"/posts/{post.id}/comment/", data={"text": f"Comment {i}"}
+        )
+    assert comment_count(post) == 2, (
+        "Убедитесь, что при добавлении комментария увеличивается "
+        "счётчик комментариев поста."
+    )
+
+
+def test_delete_comment_decreases_count(
+        mixer: Mixer, user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(Comment, post=post, author=user)
+    assert comment_count(post) == 3
+    user_client.post(
+        f"/posts/{post.id}/delete_comment/{comments[0].id}/"
+    )
+    assert comment_count(post) == 2, (
+        "Убедитесь, что при удалении комментария уменьшается "
+        "счётчик комментариев поста."
+    )
+
+
+def test_cascade_delete_decreases_count(
+        mixer: Mixer, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.blend(Comment, post=post)
+    mixer.cycle(2).blend(Comment, post=post, author=another_user)
+    another_user.delete()
+    assert comment_count(post) == 1
+
+
+def test_recount_comments_command(mixer: Mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(4).blend(Comment, post=post)
+    Post.objects.update(comment_count=0)
+    call_command("recount_comments", stdout=None)
+    assert comment_count(post) == 4
+
+
+def test_feed_shows_stored_count(
+        mixer: Mixer, client, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend(Comment, post=post)
+    content = client.get("/").content.decode()
+    assert "Комментарии (2)" in content
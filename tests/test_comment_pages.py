@@ -0,0 +1,63 @@
+import re
+
+import pytest
+from mixer.backend.django import Mixer
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+N_COMMENTS_PER_PAGE = 20
+
+
+@pytest.fixture
+def many_comments(mixer: Mixer, post_with_published_location):
+    return mixer.cycle(N_COMMENTS_PER_PAGE + 5).blend(
+        Comment, post=post_with_published_location
+    )
+
+
+def comment_ids(content):
+    return [int(i) for i in re.findall(r'name="comment_(\d+)"', content)]
+
+
+def more_url(content):
+    match = re.search(r'data-more-comments="([^"]+)"', content)
+    return match and match.group(1).replace("&amp;", "&")
+
+
+def test_detail_renders_first_page(client, many_comments):
+    post = many_comments[0].post
+    content = client.get(f"/posts/{post.id}/").content.decode()
+    assert comment_ids(content) == [
+        comment.id for comment in many_comments[:N_COMMENTS_PER_PAGE]
+    ], (
+        "Убедитесь, что на странице поста выводится только первая "
+        "страница комментариев в порядке их добавления."
+    )
+    assert more_url(content).startswith(f"/posts/{post.id}/comments/")
+
+
+def test_fragment_returns_next_batch(
+        client, many_comments, django_assert_num_queries
+):
+    post = many_comments[0].post
+    url = more_url(client.get(f"/posts/{post.id}/").content.decode())
+    with django_assert_num_queries(2) as context:
+        content = client.get(url).content.decode()
+    assert "OFFSET" not in context.captured_queries[-1]["sql"].upper()
+    assert "<html" not in content
+    assert comment_ids(content) == [
+        comment.id for comment in many_comments[N_COMMENTS_PER_PAGE:]
+    ]
+    assert more_url(content) is None
+
+
+def test_fragment_respects_post_visibility(
+        client, user_client, many_comments
+):
+    post = many_comments[0].post
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404
+    assert user_client.get(f"/posts/{post.id}/comments/").status_code == 200
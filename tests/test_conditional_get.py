@@ -0,0 +1,145 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def no_page_cache(settings):
+    settings.PAGE_CACHE_TIMEOUT = 0
+
+
+@pytest.fixture
+def post(mixer: Mixer, user, published_category, published_location):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+
+
+def urls(post):
+    return [
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ]
+
+
+def revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+
+def test_not_modified_uses_one_small_query(
+        client, post, no_page_cache, django_assert_max_num_queries
+):
+    for url in urls(post):
+        response = client.get(url)
+        assert response.has_header("ETag") and response.has_header(
+            "Last-Modified"
+        ), url
+        with django_assert_max_num_queries(1) as context:
+            not_modified = revalidate(client, url, response)
+        assert not_modified.status_code == 304, (
+            "Убедитесь, что на повторный запрос с совпадающим ETag "
+            "возвращается ответ 304."
+        )
+        sql = context.captured_queries[0]["sql"]
+        assert '"text"' not in sql and "LIMIT" in sql, url
+
+
+def test_page_cache_answers_not_modified(
+        client, post, django_assert_num_queries
+):
+    url = f"/posts/{post.id}/"
+    response = client.get(url)
+    with django_assert_num_queries(0):
+        assert revalidate(client, url, response).status_code == 304
+
+
+def test_if_modified_since(client, post, no_page_cache):
+    url = f"/posts/{post.id}/"
+    response = client.get(url)
+    not_modified = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert not_modified.status_code == 304
+
+
+def test_if_modified_since_sees_removed_posts(
+        mixer: Mixer, client, user, published_category, published_location,
+        no_page_cache, monkeypatch
+):
+    older, newer = (
+        mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            location=published_location,
+            is_published=True,
+            pub_date=timezone.now() - timedelta(days=days),
+        )
+        for days in (2, 1)
+    )
+    response = client.get("/")
+    later = timezone.now() + timedelta(seconds=2)
+    monkeypatch.setattr(timezone, "now", lambda: later)
+    newer.delete()
+    assert client.get(
+        "/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    ).status_code == 200, (
+        "Убедитесь, что удаление поста из ленты меняет Last-Modified "
+        "страницы, даже если updated_at оставшихся постов не изменился."
+    )
+
+
+def test_changes_invalidate_validators(
+        mixer: Mixer, user_client, post, published_location
+):
+    first = {url: user_client.get(url) for url in urls(post)}
+    comment = mixer.blend("blog.Comment", post=post, author=post.author)
+    for url in urls(post):
+        assert revalidate(user_client, url, first[url]).status_code == 200, (
+            "Убедитесь, что новый комментарий меняет ETag страниц поста."
+        )
+
+    second = user_client.get(f"/posts/{post.id}/")
+    comment.text = "Новый текст"
+    comment.save()
+    assert revalidate(
+        user_client, f"/posts/{post.id}/", second
+    ).status_code == 200
+
+    third = {url: user_client.get(url) for url in urls(post)}
+    published_location.name = "Новое место"
+    published_location.save()
+    for url in urls(post):
+        assert revalidate(user_client, url, third[url]).status_code == 200
+
+
+def test_comment_author_rename_invalidates_post_validators(
+        mixer: Mixer, client, post, another_user, no_page_cache
+):
+    mixer.blend("blog.Comment", post=post, author=another_user)
+    url = f"/posts/{post.id}/"
+    response = client.get(url)
+    assert revalidate(client, url, response).status_code == 304
+    another_user.username = "renamed"
+    another_user.save()
+    assert revalidate(client, url, response).status_code == 200, (
+        "Убедитесь, что переименование автора комментария меняет ETag "
+        "страницы поста."
+    )
+
+
+def test_validators_depend_on_user(
+        client, user_client, post, no_page_cache
+):
+    url = f"/posts/{post.id}/"
+    response = user_client.get(url)
+    assert revalidate(client, url, response).status_code == 200
@@ -0,0 +1,106 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer: Mixer, user):
+    return mixer.cycle(3).blend("blog.Post", author=user)
+
+
+def export(tmp_path, *args):
+    path = tmp_path / "export.gz"
+    call_command(
+        "export_blog", *args, "--output", str(path), stderr=io.StringIO()
+    )
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as file:
+        return file.read()
+
+
+def test_ndjson_export(tmp_path, posts):
+    lines = export(tmp_path, "posts").splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert [row["id"] for row in rows] == sorted(post.id for post in posts)
+    assert rows[0]["title"] == posts[0].title
+
+
+def test_csv_export(tmp_path, posts, mixer: Mixer, user):
+    mixer.blend("blog.Comment", post=posts[0], author=user, text="a,\"b\"")
+    content = export(tmp_path, "comments", "--format", "csv")
+    header, row = csv.reader(io.StringIO(content))
+    assert header[:3] == ["id", "post_id", "author_id"]
+    assert row[3] == "a,\"b\""
+
+
+def test_csv_export_reports_records(tmp_path, posts):
+    stderr = io.StringIO()
+    call_command(
+        "export_blog", "posts", "--format", "csv",
+        "--output", str(tmp_path / "posts.csv"), stderr=stderr
+    )
+    assert "Выгружено строк: 3" in stderr.getvalue(), (
+        "Убедитесь, что строка заголовков CSV не входит в число записей."
+    )
+
+
+def test_watermark_exports_only_changes(tmp_path, posts, mixer: Mixer, user):
+    watermark = tmp_path / "watermark"
+    args = ("posts", "--watermark", str(watermark))
+    assert len(export(tmp_path, *args).splitlines()) == 3
+    assert export(tmp_path, *args) == ""
+    posts[1].title = "Изменён"
+    posts[1].save()
+    comment = mixer.blend("blog.Comment", post=posts[2], author=user)
+    rows = [json.loads(line) for line in export(tmp_path, *args).splitlines()]
+    assert {row["id"] for row in rows} == {posts[1].id, posts[2].id}, (
+        "Убедитесь, что инкрементальная выгрузка содержит только посты, "
+        "изменённые после прошлой выгрузки."
+    )
+    comments = export(
+        tmp_path, "comments", "--since", watermark.read_text()
+    )
+    assert comments == ""
+    comment.text = "Исправлен"
+    comment.save()
+    comments = export(
+        tmp_path, "comments", "--since", rows[0]["updated_at"]
+    )
+    assert json.loads(comments)["text"] == "Исправлен"
+
+
+def test_watermark_exports_visibility_changes(
+        tmp_path, mixer: Mixer, user, published_category
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    watermark = tmp_path / "watermark"
+    args = ("posts", "--watermark", str(watermark))
+    export(tmp_path, *args)
+    published_category.is_published = False
+    published_category.save()
+    rows = [json.loads(line) for line in export(tmp_path, *args).splitlines()]
+    assert [(row["id"], row["is_visible"]) for row in rows] == [
+        (post.id, False)
+    ], (
+        "Убедитесь, что инкрементальная выгрузка видит смену видимости."
+    )
+
+
+def test_admin_export_action(admin_client, posts):
+    response = admin_client.post(
+        "/admin/blog/post/",
+        {
+            "action": "export_ndjson",
+            "_selected_action": [post.pk for post in posts[:2]],
+        },
+    )
+    assert response.status_code == 200
+    assert response.streaming
+    content = gzip.decompress(b"".join(response.streaming_content))
+    assert len(content.decode().splitlines()) == 2
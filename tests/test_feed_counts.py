@@ -0,0 +1,101 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    counts = [
+        query["sql"] for query in context.captured_queries
+        if "COUNT(" in query["sql"].upper()
+    ]
+    return response, counts
+
+
+def test_count_is_cached(user_client, many_posts_with_published_locations):
+    response, counts = count_queries(user_client, "/")
+    assert len(counts) == 1
+    assert response.context["page_obj"].paginator.num_pages == 2
+    response, counts = count_queries(user_client, "/")
+    assert not counts, (
+        "Убедитесь, что число постов ленты берётся из кэша."
+    )
+    assert response.context["page_obj"].paginator.num_pages == 2
+
+
+def test_count_invalidated_on_publication_change(
+        mixer: Mixer, client, user, published_category,
+        many_posts_with_published_locations
+):
+    category_url = f"/category/{published_category.slug}/"
+    profile_url = f"/profile/{user.username}/"
+    for url in ("/", category_url, profile_url):
+        assert client.get(url).context["page_obj"].paginator.count == 20
+    mixer.blend(
+        "blog.Post", author=user, category=published_category
+    )
+    for url in ("/", category_url, profile_url):
+        assert client.get(url).context["page_obj"].paginator.count == 21
+
+    post = many_posts_with_published_locations[0]
+    post.is_published = False
+    post.save()
+    for url in ("/", category_url, profile_url):
+        assert client.get(url).context["page_obj"].paginator.count == 20
+
+    published_category.is_published = False
+    published_category.save()
+    assert client.get("/").context["page_obj"].paginator.count == 0
+
+
+def test_owner_count_is_separate(
+        user_client, client, user, many_posts_with_published_locations
+):
+    post = many_posts_with_published_locations[0]
+    post.is_published = False
+    post.save()
+    profile_url = f"/profile/{user.username}/"
+    assert client.get(profile_url).context[
+        "page_obj"
+    ].paginator.count == 19
+    assert user_client.get(profile_url).context[
+        "page_obj"
+    ].paginator.count == 20
+
+
+@override_settings(FEED_COUNT_ESTIMATE_LIMIT=N_PER_PAGE + 5)
+def test_estimated_count(client, many_posts_with_published_locations):
+    paginator = client.get("/").context["page_obj"].paginator
+    assert paginator.count == N_PER_PAGE + 5
+    assert paginator.num_pages == 2
+
+
+@override_settings(FEED_COUNT_ESTIMATE_LIMIT=N_PER_PAGE + 5)
+def test_capped_count_hides_last_pages(
+        mixer: Mixer, client, user, published_category,
+        many_posts_with_published_locations
+):
+    mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category,
+        location=None
+    )
+    response = client.get("/", {"page": 2})
+    page_obj = response.context["page_obj"]
+    assert len(page_obj) == N_PER_PAGE and page_obj.has_next(), (
+        "Убедитесь, что при неточном числе постов страница не обрезается "
+        "по лимиту подсчёта и ссылка «вперёд» остаётся."
+    )
+    content = response.content.decode()
+    assert "Последняя" not in content, (
+        "Убедитесь, что при неточном числе постов ссылка на последнюю "
+        "страницу не выводится."
+    )
+    assert f"?cursor={page_obj.next_cursor}" in content
+    assert content.count("page-item disabled") == 1
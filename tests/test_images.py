@@ -0,0 +1,130 @@
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.images import sweep_missing_variants
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def image_file(width, height, name="big_image.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=(73, 109, 137)).save(
+        buffer, format="JPEG"
+    )
+    return ImageFile(buffer, name=name)
+
+
+@pytest.fixture(autouse=True)
+def sync_workers(settings):
+    settings.POST_IMAGE_WORKERS = 0
+
+
+@pytest.fixture
+def blend_post(
+        mixer: Mixer, user, published_category,
+        django_capture_on_commit_callbacks
+):
+    def blend(image):
+        with django_capture_on_commit_callbacks(execute=True):
+            post = mixer.blend(
+                "blog.Post", author=user, category=published_category,
+                image=image
+            )
+        post.refresh_from_db()
+        return post
+    return blend
+
+
+def test_variants_built_after_commit(blend_post):
+    post = blend_post(image_file(1500, 1000))
+    variants = post.image_variants["variants"]
+    assert [(v["width"], v["height"]) for v in variants] == [
+        (640, 427), (960, 640), (1280, 853)
+    ], (
+        "Убедитесь, что после загрузки изображения создаются "
+        "его уменьшенные копии."
+    )
+    assert (post.image_variants["width"], post.image_variants["height"]) == (
+        1500, 1000
+    )
+    for variant in variants:
+        with Image.open(default_storage.open(variant["name"])) as image:
+            assert image.size == (variant["width"], variant["height"])
+
+
+def test_small_image_is_not_upscaled(blend_post):
+    post = blend_post(image_file(100, 100))
+    assert post.image_variants == {
+        "width": 100, "height": 100, "variants": []
+    }
+
+
+def test_feed_card_uses_srcset(user_client, blend_post):
+    post = blend_post(image_file(1500, 1000))
+    card = post.image_variants["variants"][0]
+    content = user_client.get("/").content.decode()
+    assert f'src="{default_storage.url(card["name"])}"' in content
+    assert 'width="640" height="427"' in content
+    assert f"{post.image.url} 1500w" in content, (
+        "Убедитесь, что srcset карточки перечисляет копии изображения "
+        "и оригинал."
+    )
+    detail = user_client.get(f"/posts/{post.id}/").content.decode()
+    assert 'width="960" height="640"' in detail
+
+
+def test_new_image_replaces_variants(
+        blend_post, django_capture_on_commit_callbacks
+):
+    post = blend_post(image_file(1500, 1000))
+    post.image = image_file(800, 400, name="other_image.jpg")
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+    post.refresh_from_db()
+    assert post.image_variants["width"] == 800
+    assert [v["width"] for v in post.image_variants["variants"]] == [640]
+
+
+def test_same_stem_images_keep_own_variants(blend_post):
+    png = blend_post(image_file(1500, 1000, name="cat.png"))
+    jpg = blend_post(image_file(1500, 1000, name="cat.jpg"))
+    png_names = {v["name"] for v in png.image_variants["variants"]}
+    jpg_names = {v["name"] for v in jpg.image_variants["variants"]}
+    assert png_names and not png_names & jpg_names, (
+        "Убедитесь, что копии изображений с одинаковым именем, но разным "
+        "расширением не совпадают."
+    )
+    assert all(default_storage.exists(name) for name in png_names)
+
+
+def test_sweep_rebuilds_abandoned_variants(blend_post):
+    old, recent = blend_post(image_file(1500, 1000)), blend_post(
+        image_file(1500, 1000, name="other.jpg")
+    )
+    Post.objects.update(image_variants={})
+    Post.objects.filter(pk=old.pk).update(
+        updated_at=old.updated_at - timedelta(hours=1)
+    )
+    assert sweep_missing_variants() == 1
+    old.refresh_from_db()
+    recent.refresh_from_db()
+    assert len(old.image_variants["variants"]) == 3, (
+        "Убедитесь, что потерянная нарезка доделывается."
+    )
+    assert recent.image_variants == {}
+
+
+def test_backfill_command(blend_post):
+    post = blend_post(image_file(1500, 1000))
+    Post.objects.update(image_variants={})
+    call_command("build_image_variants", stdout=None)
+    post.refresh_from_db()
+    assert len(post.image_variants["variants"]) == 3
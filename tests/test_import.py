@@ -0,0 +1,120 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.utils import timezone
+
+from blog.importer import BlogImporter, iter_json_array
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = Path(__file__).resolve().parent.parent / "db.json"
+
+RECORDS = [
+    {"model": "blog.comment", "pk": 1,
+     "fields": {"text": "Отлично", "post": 7, "author": 3,
+                "created_at": "2022-12-20T10:00:00Z"}},
+    {"model": "blog.post", "pk": 7,
+     "fields": {"title": "Вулкан", "text": "Проснулся\nночью",
+                "pub_date": "2022-12-19T10:00:00Z",
+                "created_at": "2022-12-18T10:00:00Z",
+                "is_published": True, "author": 3, "category": 2,
+                "location": None}},
+    {"model": "auth.user", "pk": 3,
+     "fields": {"username": "importer", "password": "!"}},
+    {"model": "blog.category", "pk": 2,
+     "fields": {"title": "Природа", "description": "-", "slug": "nature",
+                "is_published": True}},
+    {"model": "sessions.session", "pk": "x", "fields": {}},
+]
+
+
+def run_import(tmp_path, content, *args):
+    path = tmp_path / "data"
+    path.write_text(content, encoding="utf-8")
+    out = io.StringIO()
+    call_command("import_blog", str(path), *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("as_array", [False, True])
+def test_import_resolves_references(tmp_path, client, as_array):
+    if as_array:
+        content = json.dumps(RECORDS, ensure_ascii=False, indent=2)
+    else:
+        content = "\n".join(json.dumps(record) for record in RECORDS)
+    output = run_import(tmp_path, content, "--batch-size", "2")
+    assert "записей/с" in output
+    post = Post.objects.get()
+    assert post.author.username == "importer"
+    assert post.category.slug == "nature"
+    assert post.created_at.year == 2022, (
+        "Убедитесь, что импорт сохраняет created_at из файла."
+    )
+    assert post.is_visible and post.comment_count == 1
+    assert post.text_html == "Проснулся<br>ночью"
+    assert Comment.objects.get().post == post
+    response = client.get("/search/", {"q": "вулкан"})
+    assert list(response.context["page_obj"]) == [post]
+
+
+def test_import_matches_existing_objects(tmp_path, user, mixer):
+    mixer.blend("blog.Category", slug="nature")
+    user.username = "importer"
+    user.save()
+    run_import(
+        tmp_path, "\n".join(json.dumps(record) for record in RECORDS)
+    )
+    post = Post.objects.get()
+    assert post.author == user
+    assert Category.objects.count() == 1
+
+
+def test_import_repository_dump(tmp_path):
+    output = run_import(tmp_path, DB_JSON.read_text(encoding="utf-8"))
+    assert Post.objects.count() == 39
+    assert Location.objects.count() == 12
+    assert Post.objects.published().filter(
+        pub_date__gt=timezone.now()
+    ).count() == 0
+    assert "Не найдены" not in output
+
+
+def test_json_array_is_read_in_chunks():
+    content = json.dumps([{"text": "а" * 50}, {"n": [1, 2]}, 3])
+    chunks = [content[i:i + 7] for i in range(0, len(content), 7)]
+    assert list(iter_json_array(chunks)) == [
+        {"text": "а" * 50}, {"n": [1, 2]}, 3
+    ]
+
+
+def test_ids_do_not_collide_with_concurrent_writes(mixer, user):
+    importer = BlogImporter()
+    for record in RECORDS[1:4]:
+        importer.add(record)
+    concurrent = mixer.blend("blog.Post", author=user)
+    importer.finish()
+    imported = Post.objects.exclude(pk=concurrent.pk).get()
+    assert imported.title == "Вулкан", (
+        "Убедитесь, что id для импорта назначаются при вставке, "
+        "а не заранее."
+    )
+
+
+def test_failed_batch_still_finishes_committed_ones(tmp_path):
+    broken = {"model": "blog.post", "pk": 8,
+              "fields": {**RECORDS[1]["fields"], "title": None}}
+    content = "\n".join(
+        json.dumps(record) for record in (*RECORDS[2:4], RECORDS[1], broken)
+    )
+    with pytest.raises(IntegrityError):
+        run_import(tmp_path, content, "--batch-size", "3")
+    post = Post.objects.get()
+    assert post.is_visible, (
+        "Убедитесь, что после ошибки уже вставленные пачки "
+        "получают производные поля."
+    )
@@ -0,0 +1,112 @@
+import multiprocessing
+
+import pytest
+from mixer.backend.django import Mixer
+
+from core import metrics
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    return tmp_path
+
+
+def scrape(client):
+    response = client.get("/metrics/")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    return response.content.decode()
+
+
+def test_requests_are_counted_per_view(client, mixer: Mixer, user):
+    post = mixer.blend("blog.Post", author=user)
+    client.get("/")
+    client.get("/")
+    client.get(f"/posts/{post.id}/")
+    text = scrape(client)
+    assert (
+        'blogicum_requests_total{method="GET",status="200",'
+        'view="blog:index"} 2'
+    ) in text, "Убедитесь, что запросы считаются по имени представления."
+    assert (
+        'blogicum_request_duration_seconds_bucket{view="blog:index",'
+        'le="+Inf"} 2'
+    ) in text
+    assert 'blogicum_request_sql_queries_count{view="blog:post_detail"} 1' \
+        in text
+    assert "# TYPE blogicum_request_duration_seconds histogram" in text
+    assert "blogicum_cache_hit_ratio " in text
+
+
+def test_writes_are_counted(user_client, mixer: Mixer, user):
+    post = mixer.blend("blog.Post", author=user)
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Текст"})
+    assert (
+        'blogicum_writes_total{action="created",model="comment"} 1'
+    ) in scrape(user_client)
+
+
+def increment_in_child():
+    metrics.inc("blogicum_writes_total", model="post", action="deleted")
+
+
+def test_values_are_summed_across_processes(client):
+    metrics.inc("blogicum_writes_total", model="post", action="deleted")
+    process = multiprocessing.get_context("fork").Process(
+        target=increment_in_child
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert (
+        'blogicum_writes_total{action="deleted",model="post"} 2'
+    ) in scrape(client), (
+        "Убедитесь, что метрики разных процессов суммируются."
+    )
+
+
+def test_dead_process_files_are_merged(client, metrics_dir):
+    process = multiprocessing.get_context("fork").Process(
+        target=increment_in_child
+    )
+    process.start()
+    process.join()
+    metrics.inc("blogicum_writes_total", model="post", action="deleted")
+    expected = 'blogicum_writes_total{action="deleted",model="post"} 2'
+    assert expected in scrape(client)
+    assert f"{process.pid}.metrics" not in {
+        path.name for path in metrics_dir.iterdir()
+    }, "Убедитесь, что файлы завершившихся процессов сливаются."
+    assert (metrics_dir / metrics.MERGED_NAME).exists()
+    assert expected in scrape(client)
+
+
+def test_write_survives_metrics_errors(
+        settings, tmp_path, user_client, mixer: Mixer, user
+):
+    settings.METRICS_DIR = str(tmp_path / "file")
+    (tmp_path / "file").write_text("")
+    post = mixer.blend("blog.Post", author=user)
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", {"text": "Текст"}
+    )
+    assert response.status_code == 302
+    assert post.comments.count() == 1
+
+
+def test_store_grows(metrics_dir):
+    store = metrics.MmapStore(str(metrics_dir / "big.metrics"))
+    for number in range(5000):
+        store.inc(metrics.metric_key("test_total", n=number), number)
+    store.close()
+    totals = metrics.collect()
+    assert len(totals) == 5000
+    assert totals[metrics.metric_key("test_total", n=4999)] == 4999
+
+
+def test_metrics_are_private(client):
+    response = client.get("/metrics/", REMOTE_ADDR="10.0.0.1")
+    assert response.status_code == 404
@@ -0,0 +1,137 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.caches import invalidate_posts
+from blog.views import PostListView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def is_cached(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return not context.captured_queries
+
+
+@pytest.fixture
+def two_posts(mixer: Mixer, user, published_category, published_location):
+    return mixer.cycle(2).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+
+
+@pytest.fixture
+def other_category_post(mixer: Mixer, another_user, another_category):
+    return mixer.blend(
+        "blog.Post", author=another_user, category=another_category
+    )
+
+
+def urls(post):
+    return {
+        "index": "/",
+        "detail": f"/posts/{post.id}/",
+        "category": f"/category/{post.category.slug}/",
+        "profile": f"/profile/{post.author.username}/",
+    }
+
+
+def warm_up(client, *url_sets):
+    for url in {url for url_set in url_sets for url in url_set.values()}:
+        assert not is_cached(client, url)
+        assert is_cached(client, url), (
+            "Убедитесь, что повторный запрос анонимного посетителя "
+            "отдаётся из кэша."
+        )
+
+
+def test_logged_in_user_not_cached(user_client, two_posts):
+    user_client.get("/")
+    assert not is_cached(user_client, "/")
+
+
+def test_comment_purges_only_its_post_pages(
+        mixer: Mixer, client, two_posts, other_category_post
+):
+    first, second = two_posts
+    first_urls, second_urls = urls(first), urls(second)
+    other_urls = urls(other_category_post)
+    warm_up(client, first_urls, {"detail": second_urls["detail"]},
+            other_urls)
+
+    mixer.blend("blog.Comment", post=first)
+
+    for name in ("index", "detail", "category", "profile"):
+        assert not is_cached(client, first_urls[name]), name
+    assert is_cached(client, second_urls["detail"])
+    assert is_cached(client, other_urls["detail"])
+    assert is_cached(client, other_urls["category"])
+    assert is_cached(client, other_urls["profile"])
+    assert "Комментарии (1)" in client.get("/").content.decode()
+
+
+def test_new_post_purges_feeds(
+        mixer: Mixer, client, user, two_posts, other_category_post,
+        published_category
+):
+    first_urls = urls(two_posts[0])
+    other_urls = urls(other_category_post)
+    warm_up(client, first_urls, other_urls)
+
+    mixer.blend("blog.Post", author=user, category=published_category)
+
+    assert not is_cached(client, first_urls["index"])
+    assert not is_cached(client, first_urls["category"])
+    assert not is_cached(client, first_urls["profile"])
+    assert is_cached(client, first_urls["detail"])
+    assert is_cached(client, other_urls["category"])
+    assert is_cached(client, other_urls["profile"])
+
+
+def test_category_and_location_changes(
+        client, two_posts, other_category_post, published_location
+):
+    first_urls = urls(two_posts[0])
+    other_urls = urls(other_category_post)
+    warm_up(client, first_urls, other_urls)
+
+    published_location.name = "Новое место"
+    published_location.save()
+    assert not is_cached(client, first_urls["detail"])
+    assert "Новое место" in client.get(first_urls["index"]).content.decode()
+    assert is_cached(client, other_urls["detail"])
+
+    category = two_posts[0].category
+    category.is_published = False
+    category.save()
+    assert client.get(first_urls["category"]).status_code == 404
+    assert client.get(first_urls["detail"]).status_code == 404
+    assert is_cached(client, other_urls["category"])
+
+
+def test_page_invalidated_during_render_is_not_stored(
+        monkeypatch, client, two_posts
+):
+    get_context_data = PostListView.get_context_data
+
+    def invalidate_while_rendering(self, **kwargs):
+        context = get_context_data(self, **kwargs)
+        invalidate_posts(two_posts)
+        return context
+
+    monkeypatch.setattr(
+        PostListView, "get_context_data", invalidate_while_rendering
+    )
+    client.get("/")
+    monkeypatch.undo()
+    assert not is_cached(client, "/"), (
+        "Убедитесь, что страница, сброшенная во время рендера, "
+        "не сохраняется в кэш."
+    )
+    assert is_cached(client, "/")
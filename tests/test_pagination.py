@@ -0,0 +1,155 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+from conftest import N_PER_PAGE
+from core.constants import FEED_ORDERING
+from core.paginators import CursorPaginator
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts_with_equal_dates(mixer: Mixer, user, published_category):
+    pub_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=(pub_date - timedelta(hours=i // 4) for i in range(100)),
+    )
+
+
+def walk(paginator):
+    pages = [paginator.get_page()]
+    while pages[-1].has_next():
+        pages.append(paginator.get_page(pages[-1].next_cursor))
+    return pages
+
+
+def test_cursor_walk_is_complete_and_ordered(posts_with_equal_dates):
+    paginator = CursorPaginator(
+        Post.objects.all(), N_PER_PAGE, FEED_ORDERING
+    )
+    pages = walk(paginator)
+    walked = [post.id for page in pages for post in page]
+    expected = list(
+        Post.objects.order_by(*FEED_ORDERING).values_list("id", flat=True)
+    )
+    assert walked == expected, (
+        "Убедитесь, что курсорная пагинация обходит все публикации "
+        "ровно по одному разу в порядке «от новых к старым»."
+    )
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 5]
+
+
+def test_cursor_previous_page(posts_with_equal_dates):
+    paginator = CursorPaginator(
+        Post.objects.all(), N_PER_PAGE, FEED_ORDERING
+    )
+    first, second, third = walk(paginator)
+    back = paginator.get_page(third.previous_cursor)
+    assert list(back) == list(second)
+    assert back.has_next() and back.has_previous()
+    back = paginator.get_page(second.previous_cursor)
+    assert list(back) == list(first)
+    assert not back.has_previous()
+
+
+def test_cursor_page_does_not_use_offset(posts_with_equal_dates):
+    paginator = CursorPaginator(
+        Post.objects.all(), N_PER_PAGE, FEED_ORDERING
+    )
+    second = paginator.get_page(paginator.get_page().next_cursor)
+    with CaptureQueriesContext(connection) as context:
+        list(paginator.get_page(second.next_cursor))
+    assert len(context.captured_queries) == 1
+    assert "OFFSET" not in context.captured_queries[0]["sql"].upper()
+
+
+@pytest.mark.parametrize("cursor", ["", "broken", "eyJkIjoibiJ9", "e30"])
+def test_broken_cursor_returns_first_page(posts_with_equal_dates, cursor):
+    paginator = CursorPaginator(
+        Post.objects.all(), N_PER_PAGE, FEED_ORDERING
+    )
+    assert list(paginator.get_page(cursor)) == list(paginator.get_page())
+
+
+def test_feed_next_link_uses_cursor(client, posts_with_equal_dates):
+    response = client.get("/")
+    next_cursor = response.context["page_obj"].next_cursor
+    assert f"?cursor={next_cursor}" in response.content.decode(), (
+        "Убедитесь, что ссылка на следующую страницу ленты "
+        "передаёт курсор."
+    )
+    response = client.get("/", {"cursor": next_cursor})
+    pub_dates = [post.pub_date for post in response.context["page_obj"]]
+    assert len(pub_dates) == N_PER_PAGE
+    assert pub_dates == sorted(pub_dates, reverse=True)
+    assert re.search(r'href="\?cursor=[\w-]+"', response.content.decode())
+
+
+@pytest.fixture
+def many_pages(mixer: Mixer, user, published_category):
+    return mixer.cycle(N_PER_PAGE * 30).blend(
+        "blog.Post", author=user, category=published_category
+    )
+
+
+def page_links(content):
+    return re.findall(r'href="\?page=(\d+)"', content)
+
+
+def test_paginator_renders_page_window(user_client, many_pages):
+    content = user_client.get("/", {"page": 15}).content.decode()
+    assert page_links(content) == ["1", "13", "14", "16", "17", "30"], (
+        "Убедитесь, что пагинатор выводит только первую, последнюю "
+        "и соседние с текущей страницы."
+    )
+    assert content.count("page-item disabled") == 2
+    assert content.count('rel="nofollow"') == 6
+
+
+def test_last_page_link_uses_cursor(client, posts_with_equal_dates):
+    response = client.get("/")
+    last_cursor = response.context["page_obj"].last_cursor
+    assert f"?cursor={last_cursor}" in response.content.decode(), (
+        "Убедитесь, что ссылка на последнюю страницу ленты передаёт "
+        "курсор, а не номер страницы."
+    )
+    with CaptureQueriesContext(connection) as context:
+        response = client.get("/", {"cursor": last_cursor})
+    assert not any(
+        "OFFSET" in query["sql"].upper() or "COUNT(" in query["sql"]
+        for query in context.captured_queries
+    )
+    page_obj = response.context["page_obj"]
+    expected = list(
+        Post.objects.order_by(*FEED_ORDERING).values_list("id", flat=True)
+    )[-N_PER_PAGE:]
+    assert [post.id for post in page_obj] == expected
+    assert page_obj.has_previous() and not page_obj.has_next()
+    back = client.get("/", {"cursor": page_obj.previous_cursor})
+    assert [post.id for post in back.context["page_obj"]] == list(
+        Post.objects.order_by(*FEED_ORDERING).values_list("id", flat=True)
+    )[-2 * N_PER_PAGE:-N_PER_PAGE]
+
+
+def test_no_count_mode(
+        user_client, many_pages, settings, django_assert_num_queries
+):
+    settings.FEED_NUMBERED_PAGES = False
+    with CaptureQueriesContext(connection) as context:
+        response = user_client.get("/", {"page": 3})
+    assert not any(
+        "COUNT(" in query["sql"] for query in context.captured_queries
+    )
+    content = response.content.decode()
+    assert not page_links(content)
+    assert f"?cursor={response.context['page_obj'].next_cursor}" in content
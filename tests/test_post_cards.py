@@ -0,0 +1,48 @@
+import pytest
+from django.core.cache import cache
+from mixer.backend.django import Mixer
+
+from blog.caches import post_card_key
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def replace_cached_card(post, html):
+    version, _ = cache.get(post_card_key(post.id))
+    cache.set(post_card_key(post.id), (version, html))
+
+
+def test_cards_are_cached(user_client, many_posts_with_published_locations):
+    user_client.get("/")
+    page_posts = user_client.get("/").context["page_obj"]
+    cached = cache.get_many([post_card_key(post.id) for post in page_posts])
+    assert len(cached) == N_PER_PAGE, (
+        "Убедитесь, что карточки постов ленты сохраняются в кэше."
+    )
+    replace_cached_card(page_posts[0], "cached-card-marker")
+    assert "cached-card-marker" in user_client.get("/").content.decode()
+
+
+def test_card_rerendered_on_changes(
+        mixer: Mixer, user_client, many_posts_with_published_locations
+):
+    post = user_client.get("/").context["page_obj"][0]
+
+    replace_cached_card(post, "cached-card-marker")
+    mixer.blend("blog.Comment", post=post)
+    content = user_client.get("/").content.decode()
+    assert "cached-card-marker" not in content
+    assert "Комментарии (1)" in content
+
+    replace_cached_card(post, "cached-card-marker")
+    post.location.name = "Новое место"
+    post.location.save()
+    assert "cached-card-marker" not in user_client.get("/").content.decode()
+
+    replace_cached_card(post, "cached-card-marker")
+    post.title = "Новый заголовок"
+    post.save()
+    content = user_client.get("/").content.decode()
+    assert "cached-card-marker" not in content
+    assert "Новый заголовок" in content
@@ -0,0 +1,152 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.registry import registry
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    """
+    Посты разных авторов, категорий и местоположений.
+
+    Справочник категорий и местоположений загружается заранее, как
+    в работающем процессе.
+    """
+    posts = mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location__is_published=True,
+    ) + mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post",
+        category__is_published=True,
+        location__is_published=True,
+    )
+    registry.categories()
+    return posts
+
+
+def test_index_queries(client, feed_posts, django_assert_num_queries):
+    # COUNT для пагинатора и одна выборка страницы.
+    with django_assert_num_queries(2):
+        client.get("/")
+
+
+def test_logged_in_index_queries(
+        user_client, feed_posts, django_assert_num_queries
+):
+    # Сессия, пользователь, COUNT и выборка страницы; затем COUNT из кэша.
+    with django_assert_num_queries(4):
+        user_client.get("/")
+    with django_assert_num_queries(3):
+        user_client.get("/")
+
+
+def test_category_queries(
+        client, feed_posts, published_category, django_assert_num_queries
+):
+    # Категория берётся из справочника: COUNT и выборка страницы.
+    with django_assert_num_queries(2):
+        client.get(f"/category/{published_category.slug}/")
+
+
+def test_profile_queries(
+        client, feed_posts, user, django_assert_num_queries
+):
+    with django_assert_num_queries(3):
+        client.get(f"/profile/{user.username}/")
+
+
+def test_cursor_page_queries(client, feed_posts, django_assert_num_queries):
+    next_cursor = client.get("/").context["page_obj"].next_cursor
+    with django_assert_num_queries(1):
+        client.get("/", {"cursor": next_cursor})
+
+
+@pytest.mark.parametrize(
+    ("feed", "index_name"),
+    [
+        ("index", "post_published_feed_idx"),
+        ("category", "post_category_feed_idx"),
+        ("profile", "post_author_visible_feed_idx"),
+        ("profile_owner", "post_author_feed_idx"),
+        ("comments", "comment_post_created_idx"),
+    ],
+)
+def test_feed_query_plans_use_indexes(feed_posts, mixer, feed, index_name):
+    from blog.management.commands.explain_feeds import Command
+
+    mixer.blend("blog.Comment", post=feed_posts[0])
+    querysets = dict(Command().feed_querysets())
+    plan = querysets[feed][:N_PER_PAGE + 1].explain()
+    assert index_name in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.fixture
+def own_comment(mixer: Mixer, user, post_with_published_location):
+    return mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+
+
+def selects_from(context, table):
+    queries = [query["sql"] for query in context.captured_queries]
+    return [
+        sql for sql in queries
+        if sql.startswith("SELECT") and f'FROM "{table}"' in sql
+    ]
+
+
+@pytest.mark.parametrize(
+    ("client_name", "action", "data", "num_queries"),
+    [
+        # Сессия, пользователь, комментарий, UPDATE и updated_at поста.
+        ("user_client", "edit_comment", {"text": "Новый текст"}, 5),
+        # Сессия, пользователь, комментарий, DELETE и счётчик поста.
+        ("user_client", "delete_comment", None, 5),
+        # Сессия, пользователь и комментарий для редиректа на пост.
+        ("another_user_client", "edit_comment", {"text": "Чужой"}, 3),
+        ("another_user_client", "delete_comment", None, 3),
+    ],
+)
+def test_comment_edit_fetches_objects_once(
+        request, own_comment, client_name, action, data, num_queries,
+        django_assert_num_queries
+):
+    client = request.getfixturevalue(client_name)
+    url = f"/posts/{own_comment.post_id}/{action}/{own_comment.id}/"
+    with django_assert_num_queries(num_queries) as context:
+        response = client.post(url, data or {})
+    assert response.status_code == 302
+    assert len(selects_from(context, "blog_comment")) == 1
+    assert not selects_from(context, "blog_post"), (
+        "Убедитесь, что для редиректа на пост используется post_id "
+        "комментария, а не загрузка поста."
+    )
+
+
+@pytest.mark.parametrize("action", ["edit", "delete"])
+def test_post_edit_fetches_post_once(
+        another_user_client, post_with_published_location, action,
+        django_assert_num_queries
+):
+    post = post_with_published_location
+    with django_assert_num_queries(3) as context:
+        response = another_user_client.post(f"/posts/{post.id}/{action}/")
+    assert response.status_code == 302
+    assert len(selects_from(context, "blog_post")) == 1
+
+
+def test_post_delete_fetches_post_once(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as context:
+        user_client.post(f"/posts/{post.id}/delete/")
+    assert len(selects_from(context, "blog_post")) == 1
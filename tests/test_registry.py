@@ -0,0 +1,99 @@
+import multiprocessing
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Category
+from blog.registry import registry
+
+pytestmark = [pytest.mark.django_db]
+
+
+def reference_queries(context):
+    return [
+        query["sql"] for query in context.captured_queries
+        if '"blog_category"' in query["sql"]
+        or '"blog_location"' in query["sql"]
+    ]
+
+
+def test_create_form_uses_registry(
+        user_client, published_category, published_location
+):
+    registry.categories()
+    with CaptureQueriesContext(connection) as context:
+        content = user_client.get("/posts/create/").content.decode()
+    assert not reference_queries(context), (
+        "Убедитесь, что варианты категорий и местоположений формы "
+        "берутся из справочника в памяти."
+    )
+    assert f'value="{published_category.pk}"' in content
+    assert f'value="{published_location.pk}"' in content
+
+
+def test_feed_cards_use_registry(client, post_with_published_location):
+    registry.categories()
+    with CaptureQueriesContext(connection) as context:
+        content = client.get("/").content.decode()
+    assert not reference_queries(context)
+    assert post_with_published_location.location.name in content
+
+
+def invalidate_in_child():
+    registry.invalidate()
+
+
+def test_changes_reach_other_processes(published_category):
+    assert registry.published_category(published_category.slug)
+    Category.objects.filter(pk=published_category.pk).update(
+        title="Новое название", is_published=False
+    )
+    assert registry.category(published_category.pk).title != "Новое название"
+    process = multiprocessing.get_context("fork").Process(
+        target=invalidate_in_child
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert registry.category(
+        published_category.pk
+    ).title == "Новое название", (
+        "Убедитесь, что изменение справочника в другом процессе "
+        "сбрасывает справочник этого процесса."
+    )
+    assert registry.published_category(published_category.slug) is None
+
+
+def test_changes_are_picked_up_after_ttl(settings, published_category):
+    registry.categories()
+    Category.objects.filter(pk=published_category.pk).update(
+        title="Новое название"
+    )
+    settings.REGISTRY_TTL = 0
+    assert registry.category(
+        published_category.pk
+    ).title == "Новое название"
+
+
+def test_save_resets_registry(published_category):
+    registry.categories()
+    published_category.title = "Новое название"
+    published_category.save()
+    assert registry.category(
+        published_category.pk
+    ).title == "Новое название"
+
+
+def test_form_rejects_unknown_category(
+        user_client, published_category, published_location
+):
+    response = user_client.post("/posts/create/", {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": "2020-01-01T00:00",
+        "category": published_category.pk + 100,
+        "location": published_location.pk,
+    })
+    assert response.status_code == 200
+    assert "category" in response.context["form"].errors
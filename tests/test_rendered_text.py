@@ -0,0 +1,46 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = "<b>Первая</b> строка\nвторая строка " + "слово " * 500
+
+
+@pytest.fixture
+def post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category, text=LONG_TEXT
+    )
+
+
+def test_text_rendered_on_save(post):
+    assert post.text_html.startswith(
+        "&lt;b&gt;Первая&lt;/b&gt; строка<br>вторая строка"
+    )
+    assert post.excerpt == (
+        "<b>Первая</b> строка вторая строка слово слово слово слово "
+        "слово слово …"
+    )
+    post.text = "Новый текст"
+    post.save()
+    assert (post.text_html, post.excerpt) == ("Новый текст", "Новый текст")
+
+
+def test_feed_does_not_load_text(client, post):
+    with CaptureQueriesContext(connection) as context:
+        content = client.get("/").content.decode()
+    assert not any(
+        re.search(r'"blog_post"\."text"(?!_)', query["sql"])
+        for query in context.captured_queries
+    ), "Убедитесь, что запрос ленты не загружает полный текст постов."
+    assert "&lt;b&gt;Первая&lt;/b&gt; строка вторая строка" in content
+    assert "слово " * 20 not in content
+
+
+def test_detail_shows_rendered_text(client, post):
+    content = client.get(f"/posts/{post.id}/").content.decode()
+    assert post.text_html in content
@@ -0,0 +1,81 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blend_post(mixer: Mixer, user, published_category):
+    def blend(**kwargs):
+        kwargs.setdefault("text", "Обычный текст")
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category, **kwargs
+        )
+    return blend
+
+
+def found(client, query, **params):
+    response = client.get("/search/", {"q": query, **params})
+    assert response.status_code == 200
+    return response.context["page_obj"]
+
+
+def test_title_ranks_above_text(client, blend_post):
+    in_text = blend_post(title="Про погоду", text="Вулкан проснулся")
+    in_title = blend_post(title="Вулкан", text="Извержение")
+    blend_post(title="Другое")
+    assert list(found(client, "вулкан")) == [in_title, in_text], (
+        "Убедитесь, что поиск находит посты по заголовку и тексту, "
+        "а совпадения в заголовке выше."
+    )
+
+
+def test_search_respects_visibility(
+        client, blend_post, mixer: Mixer, user
+):
+    blend_post(title="Вулкан", is_published=False)
+    mixer.blend(
+        "blog.Post", title="Вулкан", author=user,
+        category__is_published=False,
+    )
+    assert not found(client, "вулкан")
+
+
+def test_index_follows_edits(client, blend_post):
+    post = blend_post(title="Вулкан")
+    post.title = "Гейзер"
+    post.save()
+    assert not found(client, "вулкан")
+    assert list(found(client, "гейзер")) == [post]
+    post.delete()
+    assert not found(client, "гейзер")
+
+
+def test_query_syntax_is_escaped(client, blend_post):
+    post = blend_post(title="Вулкан")
+    assert list(found(client, 'вулк" OR NEAR(')) == []
+    assert list(found(client, 'вулк*"')) == [post]
+    assert not found(client, '"*')
+
+
+def test_search_cursor_pagination(client, blend_post):
+    posts = [blend_post(title=f"Вулкан {i}") for i in range(N_PER_PAGE + 3)]
+    first = found(client, "вулкан")
+    content = client.get("/search/", {"q": "вулкан"}).content.decode()
+    assert "q=%D0%B2%D1%83%D0%BB%D0%BA%D0%B0%D0%BD&amp;cursor=" in content
+    second = found(client, "вулкан", cursor=first.next_cursor)
+    assert len(first) == N_PER_PAGE and len(second) == 3
+    assert set(first) | set(second) == set(posts)
+
+
+def test_rebuild_command(client, blend_post):
+    post = blend_post(title="Вулкан")
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM blog_post_fts")
+    assert not found(client, "вулкан")
+    call_command("rebuild_search_index", stdout=None)
+    assert list(found(client, "вулкан")) == [post]
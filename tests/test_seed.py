@@ -0,0 +1,60 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+from blog.models import Category, Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+SIZES = (
+    "--users", "20", "--categories", "5", "--locations", "3",
+    "--posts", "200", "--comments", "1000",
+)
+
+
+def seed(*args):
+    call_command("seed_blog", *SIZES, *args, stdout=io.StringIO())
+
+
+def snapshot():
+    return (
+        list(Post.objects.order_by("id").values_list(
+            "title", "author__username", "category__slug", "comment_count"
+        )),
+        list(Comment.objects.order_by("id").values_list("text", flat=True)),
+    )
+
+
+def test_seed_creates_requested_volumes():
+    seed("--batch-size", "64")
+    assert Post.objects.count() == 200
+    assert Comment.objects.count() == 1000
+    assert Category.objects.count() == 5
+    assert Post.objects.published().exists()
+    assert Post.objects.filter(is_visible=False).exists()
+
+
+def test_seed_is_deterministic():
+    seed("--seed", "7")
+    first = snapshot()
+    Post.objects.all().delete()
+    Category.objects.all().delete()
+    seed("--seed", "7")
+    assert snapshot() == first, (
+        "Убедитесь, что одинаковый seed даёт одинаковые данные."
+    )
+
+
+def test_seed_distributions_are_skewed():
+    seed()
+    per_author = list(
+        Post.objects.values("author").annotate(total=Count("id"))
+        .order_by("-total").values_list("total", flat=True)
+    )
+    assert per_author[0] >= 5 * per_author[len(per_author) // 2]
+    per_post = sorted(
+        Post.objects.values_list("comment_count", flat=True), reverse=True
+    )
+    assert sum(per_post[:20]) > sum(per_post) / 3
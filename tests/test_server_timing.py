@@ -0,0 +1,80 @@
+import logging
+import re
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from mixer.backend.django import Mixer
+
+from core.cache import InstrumentedCacheMixin, InstrumentedLocMemCache
+from core.instrumentation import finish_request, start_request
+
+pytestmark = [pytest.mark.django_db]
+
+
+def timings(response):
+    """Части заголовка Server-Timing: {'sql': 'dur=1.2;desc="3 queries"'}."""
+    return dict(
+        part.split(";", 1) for part in response["Server-Timing"].split(", ")
+    )
+
+
+@pytest.fixture
+def post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category
+    )
+
+
+def test_header_reports_sql_and_templates(client, post, caplog):
+    with caplog.at_level(logging.INFO, logger="core.middleware"):
+        response = client.get(f"/posts/{post.id}/")
+    parts = timings(response)
+    assert set(parts) == {"total", "sql", "tpl", "cache"}
+    assert re.search(r'desc="[1-9]\d* queries"', parts["sql"]), (
+        "Убедитесь, что Server-Timing содержит число SQL-запросов."
+    )
+    assert float(parts["tpl"].removeprefix("dur=")) > 0
+    record, = caplog.records
+    assert record.view_name == "blog:post_detail"
+    assert "view=blog:post_detail" in record.getMessage()
+
+
+def test_cache_hits_are_counted(client, post):
+    client.get("/")
+    response = client.get("/")
+    assert 'desc="0 queries"' in timings(response)["sql"]
+    hits = re.search(r"hit=(\d+)", timings(response)["cache"])
+    assert int(hits.group(1)) >= 1, (
+        "Убедитесь, что ответ из кэша страниц учитывается как попадание."
+    )
+
+
+class GetMultiCache(LocMemCache):
+    """Как memcached: get_many читает ключи сразу, минуя get."""
+
+    def get_many(self, keys, version=None):
+        return {
+            key: LocMemCache.get(self, key, version=version)
+            for key in keys
+            if LocMemCache.has_key(self, key, version=version)
+        }
+
+
+class InstrumentedGetMultiCache(InstrumentedCacheMixin, GetMultiCache):
+    pass
+
+
+@pytest.mark.parametrize(
+    "backend", [InstrumentedLocMemCache, InstrumentedGetMultiCache]
+)
+def test_get_many_counts_every_key_once(backend):
+    cache = backend("get-many", {})
+    cache.set("present", 1)
+    metrics, token = start_request(None)
+    try:
+        assert cache.get_many(["present", "absent"]) == {"present": 1}
+    finally:
+        finish_request(token)
+    assert (metrics.cache_hits, metrics.cache_misses) == (1, 1), (
+        "Убедитесь, что get_many учитывает каждый ключ ровно один раз."
+    )
@@ -0,0 +1,65 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+from core.slow_queries import normalize_sql
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    settings.SLOW_QUERY_LOG = tmp_path / "slow.log"
+    return settings.SLOW_QUERY_LOG
+
+
+def test_normalize_sql():
+    assert normalize_sql(
+        "SELECT * FROM t WHERE a = 'x''y' AND b IN (%s, %s)\n LIMIT 10"
+    ) == "SELECT * FROM t WHERE a = ? AND b IN (...) LIMIT ?"
+
+
+def test_slow_queries_are_logged_with_plan(
+        client, slow_log, mixer: Mixer, user, published_category
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    client.get(f"/posts/{post.id}/")
+    entries = [json.loads(line) for line in slow_log.read_text().splitlines()]
+    assert entries and all(
+        entry["view"] == "blog:post_detail" for entry in entries
+    )
+    post_query = next(
+        entry for entry in entries
+        if entry["sql"].startswith('SELECT "blog_post"')
+    )
+    assert post_query["params"] == ["int"] * len(post_query["params"])
+    assert any("blog_post" in step for step in post_query["plan"]), (
+        "Убедитесь, что в журнал попадает EXPLAIN QUERY PLAN запроса."
+    )
+    assert str(post.id) not in post_query["sql"]
+
+
+def test_fast_queries_are_not_logged(client, settings, tmp_path):
+    settings.SLOW_QUERY_LOG = tmp_path / "slow.log"
+    client.get("/")
+    assert not settings.SLOW_QUERY_LOG.exists()
+
+
+def test_aggregate_command(
+        client, slow_log, mixer: Mixer, user, published_category
+):
+    mixer.blend("blog.Post", author=user, category=published_category)
+    client.get("/")
+    client.get("/", {"page": 1})
+    out = io.StringIO()
+    call_command(
+        "slow_queries", "--log", str(slow_log), "--order", "count",
+        "--limit", "1", stdout=out,
+    )
+    output = out.getvalue()
+    assert "2 раз" in output
+    assert "blog:index" in output
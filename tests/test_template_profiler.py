@@ -0,0 +1,84 @@
+import io
+import threading
+
+import pytest
+from django.core.management import call_command
+from django.template import Context, Template
+from mixer.backend.django import Mixer
+
+from core.template_profiler import profiler
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def profiling(settings):
+    settings.PAGE_CACHE_TIMEOUT = 0
+    profiler.enable()
+    profiler.reset()
+    yield profiler
+    profiler.disable()
+    profiler.reset()
+
+
+@pytest.fixture
+def posts(mixer: Mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category
+    )
+
+
+def test_profile_includes_and_tags(client, profiling, posts):
+    client.get("/")
+    client.get("/")
+    report = profiling.report()
+    assert 'include "includes/paginator.html"' in report
+    assert "tag post_cards" in report
+    assert "template includes/post_card.html" in report
+    stacks = profiling.collapsed_stacks()
+    assert ";tag post_cards;template includes/post_card.html " in stacks, (
+        "Убедитесь, что шаблоны карточек вложены в стек тега post_cards."
+    )
+    count = profiling.totals["template blog/index.html"][0]
+    assert count == 2, "Убедитесь, что профиль копится по запросам."
+
+
+def test_concurrent_loads_are_instrumented_once(profiling):
+    template = Template("{% if True %}x{% endif %}")
+    threads = [
+        threading.Thread(target=profiling.instrument, args=(template,))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    template.render(Context())
+    assert profiling.totals["tag if"][0] == 1, (
+        "Убедитесь, что шаблон инструментируется один раз."
+    )
+
+
+def test_profile_is_off_by_default(client, posts):
+    client.get("/")
+    assert not profiler.enabled
+    assert not profiler.totals
+    assert client.get("/metrics/templates/").status_code == 404
+
+
+def test_profile_view(client, profiling, posts):
+    client.get("/")
+    response = client.get("/metrics/templates/", {"format": "stacks"})
+    assert response.status_code == 200
+    assert "template blog/index.html" in response.content.decode()
+
+
+def test_profile_command(profiling, posts, tmp_path):
+    out = io.StringIO()
+    stacks = tmp_path / "stacks.txt"
+    call_command(
+        "profile_templates", "/", "--requests", "2", "--sort", "count",
+        "--stacks", str(stacks), stdout=out,
+    )
+    assert "template blog/index.html" in out.getvalue()
+    assert stacks.read_text().splitlines()
@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def is_visible(post):
+    return Post.objects.values_list("is_visible", flat=True).get(pk=post.pk)
+
+
+@pytest.fixture
+def post(mixer: Mixer, user, published_category):
+    return mixer.blend("blog.Post", author=user, category=published_category)
+
+
+def test_save_computes_visibility(post):
+    assert is_visible(post)
+    post.pub_date = timezone.now() + timedelta(days=1)
+    post.save()
+    assert not is_visible(post)
+    post.pub_date = timezone.now()
+    post.is_published = False
+    post.save()
+    assert not is_visible(post)
+
+
+def test_scheduler_publishes_due_posts(client, post):
+    post.pub_date = timezone.now() + timedelta(minutes=1)
+    post.save()
+    assert post not in client.get("/").context["page_obj"]
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    call_command("publish_scheduled", stdout=None)
+    assert is_visible(post)
+    assert post in client.get("/").context["page_obj"], (
+        "Убедитесь, что команда publish_scheduled показывает в ленте "
+        "посты, время публикации которых наступило, и сбрасывает кэш."
+    )
+
+
+def test_category_toggle_updates_posts(client, post, published_category):
+    client.get("/")
+    published_category.is_published = False
+    published_category.save()
+    assert not is_visible(post)
+    assert post not in client.get("/").context["page_obj"]
+    published_category.is_published = True
+    published_category.save()
+    assert is_visible(post)
+
+
+def test_category_delete_hides_posts(post, published_category):
+    published_category.delete()
+    assert not is_visible(post)
+
+
+def test_feed_filters_by_flag(client, post):
+    with CaptureQueriesContext(connection) as context:
+        client.get("/")
+    count_sql = context.captured_queries[0]["sql"]
+    assert '"blog_post"."is_visible"' in count_sql
+    assert "JOIN" not in count_sql and "pub_date" not in count_sql, (
+        "Убедитесь, что ленты фильтруют посты по полю is_visible "
+        "без JOIN с категорией и сравнения с текущим временем."
+    )
+
+
+def test_profile_owner_and_visitor_paths(
+        mixer: Mixer, client, user_client, another_user_client, user, post
+):
+    hidden = mixer.blend(
+        "blog.Post", author=user, category__is_published=False
+    )
+    url = f"/profile/{user.username}/"
+    for visitor in (client, another_user_client):
+        with CaptureQueriesContext(connection) as context:
+            page = visitor.get(url).context["page_obj"]
+        assert list(page) == [post], (
+            "Убедитесь, что посетители профиля видят только "
+            "опубликованные посты автора."
+        )
+        assert not any(
+            " OR " in query["sql"] for query in context.captured_queries
+        )
+    assert set(user_client.get(url).context["page_obj"]) == {post, hidden}
+
+
+def test_post_detail_owner_and_visitor(client, user_client, post):
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.id}/").status_code == 404
+    assert user_client.get(f"/posts/{post.id}/").status_code == 200
+
+
+def test_scheduler_checks_only_due_hidden_posts(post):
+    scheduled = Post.objects.filter(pk=post.pk)
+    scheduled.update(
+        is_visible=False, pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    updated_at = scheduled.get().updated_at
+    with CaptureQueriesContext(connection) as context:
+        call_command("publish_scheduled", stdout=None)
+    assert is_visible(post)
+    assert scheduled.get().updated_at > updated_at, (
+        "Убедитесь, что смена видимости обновляет updated_at поста."
+    )
+    select = context.captured_queries[0]["sql"]
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {select}")
+        plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+    assert "post_scheduled_idx" in plan, (
+        "Убедитесь, что планировщик выбирает посты по частичному индексу."
+    )